@@ -1,15 +1,30 @@
 import os
+import random
 from abc import ABC, abstractmethod
 
 import numpy as np
+import torch
 from tqdm import tqdm
 
 import aow.constants.info_keys as InfoKeys
 import aow.pieces as Pieces
 from aow.game.aow import ArtOfWar
+from aow.game.vec_aow import VecArtOfWar
 from buffer.episode import Episode
 from learnings.base import Learning
 from utils import save_to_video
+from utils.checkpoint import save_array, write_checkpoint
+from .rollout import AsyncRolloutPool, EpisodeResult, RolloutPool
+
+
+class VecGame:
+    def __init__(self, episode: int, render: bool):
+        # The episode a game of VecArtOfWar plays, with what BaseAgent.play_episode keeps in its locals
+        self.episode = episode
+        self.render = render
+        self.episodes = {Pieces.WHITE: Episode(), Pieces.BLACK: Episode()}
+        self.data: dict[int, list | None] = {Pieces.WHITE: None, Pieces.BLACK: None}
+        self.renders: list[np.ndarray] = []
 
 
 class BaseAgent(ABC):
@@ -20,6 +35,10 @@ class BaseAgent(ABC):
             episodes: int,
             train_on: int,
             result_folder: str,
+            workers: int = 1,
+            asynchronous: bool = False,
+            max_staleness: int = 1,
+            num_envs: int = 1,
     ) -> None:
         super().__init__()
         self.env = env
@@ -27,7 +46,16 @@ class BaseAgent(ABC):
         self.episodes = episodes
         self.train_on = train_on
         self.current_ep = 0
+        # The episodes remembered since the last learn. The buffers are not part of a checkpoint, so a resumed run
+        # starts counting again
+        self.collected = 0
         self.result_folder = result_folder
+        self.workers = workers
+        self.asynchronous = asynchronous
+        self.max_staleness = max_staleness
+        # The games played together, with one forward pass per player for all of them
+        self.num_envs = num_envs
+        self.vec_env: VecArtOfWar | None = None
 
         self.moves = np.zeros((2, episodes), dtype=np.uint32)
         self.rewards = np.zeros((2, episodes))
@@ -36,47 +64,79 @@ class BaseAgent(ABC):
         self.mates_lose = np.zeros((2, episodes), dtype=np.uint32)
         self.checks_lose = np.zeros((2, episodes), dtype=np.uint32)
 
-    def update_stats(self, infos: list[dict]):
+    def update_stats(self, infos: list[dict], episode: int | None = None):
+        episode = self.current_ep if episode is None else episode
         for turn, info in enumerate(infos):
             if InfoKeys.CHECK_MATE_WIN in info:
-                self.mates_win[turn, self.current_ep] += 1
+                self.mates_win[turn, episode] += 1
 
             if InfoKeys.CHECK_MATE_LOSE in info:
-                self.mates_lose[turn, self.current_ep] += 1
+                self.mates_lose[turn, episode] += 1
 
             if InfoKeys.CHECK_WIN in info:
-                self.checks_win[turn, self.current_ep] += 1
+                self.checks_win[turn, episode] += 1
 
             if InfoKeys.CHECK_LOSE in info:
-                self.checks_lose[turn, self.current_ep] += 1
+                self.checks_lose[turn, episode] += 1
+
+    def get_learner(self, turn: int) -> Learning:
+        return self.learner
+
+    def get_learners(self) -> list[Learning]:
+        return [self.learner]
+
+    def get_episode_stats(self, episode: int) -> np.ndarray:
+        return np.stack([
+            self.moves[:, episode],
+            self.mates_win[:, episode],
+            self.checks_win[:, episode],
+            self.mates_lose[:, episode],
+            self.checks_lose[:, episode],
+        ])
+
+    def set_episode_stats(self, episode: int, stats: np.ndarray):
+        (
+            self.moves[:, episode],
+            self.mates_win[:, episode],
+            self.checks_win[:, episode],
+            self.mates_lose[:, episode],
+            self.checks_lose[:, episode],
+        ) = stats
 
     def take_action(self, turn: int, episode: Episode):
-        mask = self.env.aow_logic.get_all_actions(turn)[-1]
-        state = self.env.aow_board.get_state(turn)
+        state, actions = self.env.observe()
 
-        action, prob, value = self.learner.take_action(state, mask)
-        rewards, done, infos = self.env.step(action)
-        self.moves[turn, self.current_ep] += 1
+        env_action, *chosen = self.get_learner(turn).choose_action(state, actions)
+        rewards, done, infos = self.env.step(env_action)
+        return done, self.remember_action(turn, self.current_ep, episode, state, chosen, rewards, infos)
 
-        self.update_stats(infos)
+    def remember_action(
+            self, turn: int, episode_number: int, episode: Episode, state: np.ndarray, chosen: list, rewards: list,
+            infos: list[set],
+    ) -> list:
+        action, prob, value, mask = chosen
+        self.moves[turn, episode_number] += 1
+
+        self.update_stats(infos, episode_number)
         goal = InfoKeys.CHECK_MATE_WIN in infos[turn]
         episode.add(state, rewards[turn], action, goal, prob, value, mask)
 
-        return done, [state, rewards, action, goal, prob, value, mask]
+        return [state, rewards, action, goal, prob, value, mask]
 
     @staticmethod
     def update_enemy(prev: list, episode: Episode, reward: int):
         if prev is None:
             return
         prev[1] = reward
-        episode.add(*prev)
+        episode.add(*prev, reply=True)
 
-    def train_episode(self, render: bool):
+    def play_episode(self, episode: int, render: bool) -> EpisodeResult:
+        self.current_ep = episode
         renders = []
 
         def render_fn():
             if self.env.pygame_utils.render_mode != "human":
-                renders.append(self.env.pygame_utils.render(self.env.aow_board.get_numeric_board()))
+                renders.append(self.env.pygame_utils.render(self.env.aow_board.get_board()))
 
         self.env.reset()
         episode_white = Episode()
@@ -99,14 +159,92 @@ class BaseAgent(ABC):
                 if done:
                     break
 
-        self.add_episodes(episode_white, episode_black)
-        self.rewards[Pieces.BLACK, self.current_ep] = episode_black.total_reward()
-        self.rewards[Pieces.WHITE, self.current_ep] = episode_white.total_reward()
-
         if (render or self.env.aow_logic.done) and self.env.pygame_utils.render_mode != "human":
             path = os.path.join(self.result_folder, "renders", f"episode_{self.current_ep}.mp4")
             save_to_video(path, np.array(renders))
 
+        return EpisodeResult(episode, episode_white, episode_black, self.get_episode_stats(episode))
+
+    def get_vec_env(self) -> VecArtOfWar:
+        if self.vec_env is None:
+            self.vec_env = VecArtOfWar(self.num_envs, self.env.aow_logic.max_steps, self.env.aow_logic.engine)
+        return self.vec_env
+
+    def play_episodes(self, episodes: list[tuple[int, bool]]) -> list[EpisodeResult]:
+        # The same episodes as play_episode, played num_envs at a time. A game that finishes starts the next episode
+        if self.num_envs <= 1:
+            return [self.play_episode(episode, render) for episode, render in episodes]
+
+        vec_env = self.get_vec_env()
+        pending = list(reversed(episodes))
+        keep_renders = self.env.pygame_utils.render_mode != "human"
+        results = []
+
+        def start_game(index: int) -> VecGame | None:
+            if not pending:
+                return None
+            game = VecGame(*pending.pop())
+            if keep_renders:
+                game.renders.append(self.env.pygame_utils.render(vec_env.boards[index]))
+            return game
+
+        vec_env.reset()
+        games: list[VecGame | None] = [start_game(index) for index in range(len(vec_env))]
+        while any(game is not None for game in games):
+            active = np.array([game is not None for game in games])
+            states = vec_env.get_states()
+            actions = vec_env.get_actions()
+            turns = vec_env.turns.copy()
+
+            env_actions = np.zeros(len(vec_env), dtype=np.int64)
+            chosen = {}
+            for turn in (Pieces.WHITE, Pieces.BLACK):
+                indices = np.flatnonzero(active & (turns == turn))
+                if len(indices) == 0:
+                    continue
+                choices = self.get_learner(turn).choose_actions(states[indices], [actions[index] for index in indices])
+                for index, (env_action, *choice) in zip(indices, choices):
+                    env_actions[index] = env_action
+                    chosen[index] = choice
+
+            _, _, rewards, dones, infos = vec_env.step(env_actions, active)
+            for index in np.flatnonzero(active):
+                game, turn = games[index], int(turns[index])
+                data = self.remember_action(
+                    turn, game.episode, game.episodes[turn], states[index], chosen[index], rewards[index].tolist(),
+                    infos[index],
+                )
+                self.update_enemy(game.data[1 - turn], game.episodes[1 - turn], data[1][1 - turn])
+                game.data[turn] = data
+                if keep_renders:
+                    # A finished game was reset already, its last position is kept in final_boards
+                    board = vec_env.final_boards[index] if dones[index] else vec_env.boards[index]
+                    game.renders.append(self.env.pygame_utils.render(board))
+
+                if dones[index]:
+                    mated = any(InfoKeys.CHECK_MATE_WIN in info for info in infos[index])
+                    if (game.render or mated) and keep_renders:
+                        path = os.path.join(self.result_folder, "renders", f"episode_{game.episode}.mp4")
+                        save_to_video(path, np.array(game.renders))
+                    results.append(EpisodeResult(
+                        game.episode, game.episodes[Pieces.WHITE], game.episodes[Pieces.BLACK],
+                        self.get_episode_stats(game.episode),
+                    ))
+                    games[index] = start_game(index)
+
+        return sorted(results, key=lambda result: result.episode)
+
+    def record_episode(self, result: EpisodeResult, remember: bool = True):
+        if remember:
+            self.add_episodes(result.white, result.black)
+            self.collected += 1
+        self.set_episode_stats(result.episode, result.stats)
+        self.rewards[Pieces.BLACK, result.episode] = result.black.total_reward()
+        self.rewards[Pieces.WHITE, result.episode] = result.white.total_reward()
+
+    def train_episode(self, render: bool):
+        self.record_episode(self.play_episode(self.current_ep, render))
+
     def log(self, episode: int):
         print(
             f"+ Episode {episode} Results [B | w]:",
@@ -127,33 +265,126 @@ class BaseAgent(ABC):
             "mates": self.mates_win[:, episode]
         }
 
+    def is_render_episode(self, episode: int, render_each: int) -> bool:
+        return episode % render_each == 0 or episode == self.episodes - 1
+
     def train(self, render_each: int, save_on_learn: bool = True):
-        for ep in (pbar := tqdm(range(self.episodes))):
-            self.train_episode(ep % render_each == 0 or ep == self.episodes - 1)
+        if self.asynchronous:
+            self.train_async(render_each, save_on_learn)
+            return
+
+        # The weights only change in learn, so all episodes up to the next learn can be played at once by the workers
+        pool = RolloutPool(self, self.workers) if self.workers > 1 else None
+        pbar = tqdm(total=self.episodes, initial=self.current_ep)
+        start = self.current_ep
+        while start < self.episodes:
+            # Up to the next learn, which also works when a resumed run starts between two learns
+            end = min(start + self.train_on - self.collected, self.episodes)
+            episodes = [(ep, self.is_render_episode(ep, render_each)) for ep in range(start, end)]
+            if pool is None:
+                results = self.play_episodes(episodes)
+            else:
+                results = pool.play(self, episodes)
+
+            for result in results:
+                self.record_episode(result)
+                self.current_ep = result.episode + 1
+                pbar.update()
+                pbar.set_postfix(self.tqdm_postfix(result.episode))
+
+            self.learn_collected(save_on_learn)
+            start = end
+        pbar.close()
+
+        if pool is not None:
+            pool.close()
+
+    def train_async(self, render_each: int, save_on_learn: bool = True):
+        # The workers keep playing while the learner learns, and pick up the new weights when they are published.
+        # Episodes played with weights more than max_staleness versions old are only counted in the stats
+        pool = AsyncRolloutPool(self, self.workers, render_each)
+        for _ in (pbar := tqdm(range(self.current_ep, self.episodes), total=self.episodes, initial=self.current_ep)):
+            result = pool.get()
+            fresh = pool.get_version() - result.white.policy_version <= self.max_staleness
+            self.record_episode(result, remember=fresh)
             self.current_ep += 1
-            pbar.set_postfix(self.tqdm_postfix(ep))
-            if (ep + 1) % self.train_on == 0:
-                self.learn()
-                if save_on_learn:
-                    self.save()
+            pbar.set_postfix(self.tqdm_postfix(result.episode))
+
+            if self.learn_collected(save_on_learn):
+                pool.publish(self)
+        pool.close()
+
+    def learn_collected(self, save_on_learn: bool) -> bool:
+        if self.collected < self.train_on:
+            return False
+        self.collected = 0
+        self.learn()
+        if save_on_learn:
+            self.save()
+        return True
 
     def save(self):
         if not os.path.exists(self.result_folder):
             os.makedirs(self.result_folder, exist_ok=True)
 
         folder = self.result_folder
-        np.save(os.path.join(folder, "moves.npy"), self.moves)
-        np.save(os.path.join(folder, "rewards.npy"), self.rewards)
-        np.save(os.path.join(folder, "mates_win.npy"), self.mates_win)
-        np.save(os.path.join(folder, "mates_lose.npy"), self.mates_lose)
-        np.save(os.path.join(folder, "checks_win.npy"), self.checks_win)
-        np.save(os.path.join(folder, "checks_lose.npy"), self.checks_lose)
+        for name, stats in self.get_stats().items():
+            write_checkpoint(stats, os.path.join(folder, f"{name}.npy"), save_array)
         self.save_learners()
+        # Written last, the checkpoints are written in order so the learners of this save are already on disk
+        write_checkpoint(self.get_checkpoint(), os.path.join(folder, "agent.pt"))
+
+    def get_stats(self) -> dict[str, np.ndarray]:
+        return {
+            "moves": self.moves,
+            "rewards": self.rewards,
+            "mates_win": self.mates_win,
+            "mates_lose": self.mates_lose,
+            "checks_win": self.checks_win,
+            "checks_lose": self.checks_lose,
+        }
+
+    def get_checkpoint(self) -> dict:
+        return {
+            "current_ep": self.current_ep,
+            "stats": self.get_stats(),
+            "rng": {
+                "python": random.getstate(),
+                "numpy": np.random.get_state(),
+                "torch": torch.get_rng_state(),
+                "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else [],
+            },
+        }
+
+    def load(self) -> bool:
+        path = os.path.join(self.result_folder, "agent.pt")
+        if not os.path.exists(path):
+            return False
+
+        checkpoint = torch.load(path, weights_only=False)
+        self.current_ep = checkpoint["current_ep"]
+        for name, stats in self.get_stats().items():
+            # The run may continue with a different number of episodes
+            saved = checkpoint["stats"][name]
+            episodes = min(stats.shape[1], saved.shape[1])
+            stats[:, :episodes] = saved[:, :episodes]
+
+        random.setstate(checkpoint["rng"]["python"])
+        np.random.set_state(checkpoint["rng"]["numpy"])
+        torch.set_rng_state(checkpoint["rng"]["torch"])
+        if torch.cuda.is_available() and checkpoint["rng"]["cuda"]:
+            torch.cuda.set_rng_state_all(checkpoint["rng"]["cuda"])
+        self.load_learners()
+        return True
 
     @abstractmethod
     def save_learners(self):
         pass
 
+    @abstractmethod
+    def load_learners(self):
+        pass
+
     @abstractmethod
     def learn(self):
         pass
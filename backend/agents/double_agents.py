@@ -1,11 +1,11 @@
 import os
 from copy import deepcopy
 
-import torch
-
+import aow.pieces as Pieces
 from aow.game.aow import ArtOfWar
 from buffer.episode import Episode
 from learnings.base import Learning
+from utils.checkpoint import write_checkpoint
 from .base import BaseAgent
 
 
@@ -17,11 +17,22 @@ class DoubleAgents(BaseAgent):
             episodes: int,
             train_on: int,
             result_folder: str,
+            workers: int = 1,
+            asynchronous: bool = False,
+            max_staleness: int = 1,
+            num_envs: int = 1,
     ) -> None:
-        super().__init__(env, learner, episodes, train_on, result_folder)
+        super().__init__(env, learner, episodes, train_on, result_folder, workers, asynchronous, max_staleness,
+                         num_envs)
         self.white_agent = deepcopy(learner)
         self.black_agent = deepcopy(learner)
 
+    def get_learner(self, turn: int) -> Learning:
+        return self.white_agent if turn == Pieces.WHITE else self.black_agent
+
+    def get_learners(self) -> list[Learning]:
+        return [self.white_agent, self.black_agent]
+
     def add_episodes(self, white: Episode, black: Episode) -> None:
         self.white_agent.remember(white)
         self.black_agent.remember(black)
@@ -36,5 +47,9 @@ class DoubleAgents(BaseAgent):
 
         self.white_agent.save(self.result_folder, "white")
         self.black_agent.save(self.result_folder, "black")
-        torch.save(self.white_agent.state_dict(), f"{self.result_folder}/white_dict.pt")
-        torch.save(self.black_agent.state_dict(), f"{self.result_folder}/black_dict.pt")
+        write_checkpoint(self.white_agent.state_dict(), f"{self.result_folder}/white_dict.pt")
+        write_checkpoint(self.black_agent.state_dict(), f"{self.result_folder}/black_dict.pt")
+
+    def load_learners(self):
+        self.white_agent.load(self.result_folder, "white")
+        self.black_agent.load(self.result_folder, "black")
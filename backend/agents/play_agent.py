@@ -20,16 +20,15 @@ class PlayAgent(SingleAgent):
         self.black_learner.eval()
 
     def take_action(self, turn: int, episode: Episode):
-        mask = self.env.aow_logic.get_all_actions(turn)[-1]
-        state = self.env.aow_board.get_state(turn)
+        state, actions = self.env.observe()
 
         # Use the appropriate learner based on the current turn
         if turn == 0:
-            action, prob, value = self.white_learner.take_action(state, mask)
+            env_action, action, prob, value, mask = self.white_learner.choose_action(state, actions)
         else:
-            action, prob, value = self.black_learner.take_action(state, mask)
+            env_action, action, prob, value, mask = self.black_learner.choose_action(state, actions)
 
-        rewards, done, infos = self.env.step(action)
+        rewards, done, infos = self.env.step(env_action)
         self.moves[turn, self.current_ep] += 1
 
         self.update_stats(infos)
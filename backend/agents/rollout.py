@@ -0,0 +1,179 @@
+import multiprocessing as mp
+import queue
+from copy import deepcopy
+from multiprocessing.connection import Connection
+
+import numpy as np
+import torch
+import torch.multiprocessing as torch_mp
+
+from buffer.episode import Episode
+
+
+class EpisodeResult:
+    def __init__(self, episode: int, white: Episode, black: Episode, stats: np.ndarray):
+        self.episode = episode
+        self.white = white
+        self.black = black
+        self.stats = stats
+
+
+def make_worker_agent(agent):
+    # The workers play on the cpu, the agent may train on the gpu
+    worker_agent = deepcopy(agent)
+    for learner in worker_agent.get_learners():
+        learner.device = torch.device("cpu")
+        learner.to(learner.device)
+    return worker_agent
+
+
+def rollout_worker(connection: Connection, agent) -> None:
+    # Every worker gets one core, otherwise N workers each start a thread per core
+    torch.set_num_threads(1)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+
+        state_dicts, counters, episodes = message
+        for learner, state_dict, learner_counters in zip(agent.get_learners(), state_dicts, counters):
+            learner.load_state_dict(state_dict)
+            # The counters are not in the state_dict, but the exploration of e.g. DQN depends on them
+            learner.set_counters(learner_counters)
+        connection.send(agent.play_episodes(episodes))
+    connection.close()
+
+
+class RolloutPool:
+    def __init__(self, agent, workers: int):
+        worker_agent = make_worker_agent(agent)
+        context = mp.get_context("spawn")
+        self.connections: list[Connection] = []
+        self.processes: list = []
+        for _ in range(workers):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=rollout_worker, args=(worker_connection, worker_agent), daemon=True)
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def play(self, agent, episodes: list[tuple[int, bool]]) -> list[EpisodeResult]:
+        state_dicts = [
+            {key: value.detach().cpu() for key, value in learner.state_dict().items()}
+            for learner in agent.get_learners()
+        ]
+        counters = [learner.get_counters() for learner in agent.get_learners()]
+
+        count = len(self.connections)
+        for index, connection in enumerate(self.connections):
+            connection.send((state_dicts, counters, episodes[index::count]))
+
+        results = []
+        for connection in self.connections:
+            results.extend(connection.recv())
+        return sorted(results, key=lambda result: result.episode)
+
+    def close(self) -> None:
+        for connection in self.connections:
+            connection.send(None)
+            connection.close()
+        for process in self.processes:
+            process.join()
+
+
+class SharedWeights:
+    def __init__(self, learners: list, context):
+        # The tensors live in shared memory, so a publish is seen by every worker without sending the weights
+        self.state_dicts = [
+            {key: value.detach().cpu().clone().share_memory_() for key, value in learner.state_dict().items()}
+            for learner in learners
+        ]
+        # The counters, e.g. the epsilon of DQN, are shared as float64 values in the order of their keys
+        self.counter_keys = [list(learner.get_counters()) for learner in learners]
+        self.counters = [
+            torch.tensor(list(learner.get_counters().values()), dtype=torch.float64).share_memory_() for learner in learners
+        ]
+        self.version = context.Value("i", 0, lock=False)
+        self.lock = context.Lock()
+
+    def get_version(self) -> int:
+        return self.version.value
+
+    def publish(self, learners: list) -> int:
+        with self.lock:
+            for state_dict, counters, learner in zip(self.state_dicts, self.counters, learners):
+                for key, value in learner.state_dict().items():
+                    state_dict[key].copy_(value.detach())
+                counters.copy_(torch.tensor(list(learner.get_counters().values()), dtype=torch.float64))
+            self.version.value += 1
+            return self.version.value
+
+    def load(self, learners: list) -> int:
+        with self.lock:
+            for learner, state_dict, keys, counters in zip(learners, self.state_dicts, self.counter_keys, self.counters):
+                learner.load_state_dict(state_dict)
+                # Cast back to the types of the learner's own counters, e.g. learn_steps is an int
+                types = learner.get_counters()
+                learner.set_counters({key: type(types[key])(value) for key, value in zip(keys, counters.tolist())})
+            return self.version.value
+
+
+def async_rollout_worker(agent, weights: SharedWeights, queue, next_episode, episodes: int, render_each: int) -> None:
+    torch.set_num_threads(1)
+    version = -1
+    while True:
+        with next_episode.get_lock():
+            episode = next_episode.value
+            next_episode.value += 1
+        if episode >= episodes:
+            break
+
+        if weights.get_version() != version:
+            version = weights.load(agent.get_learners())
+        result = agent.play_episode(episode, agent.is_render_episode(episode, render_each))
+        result.white.policy_version = version
+        result.black.policy_version = version
+        queue.put(result)
+
+
+class AsyncRolloutPool:
+    def __init__(self, agent, workers: int, render_each: int):
+        context = torch_mp.get_context("spawn")
+        worker_agent = make_worker_agent(agent)
+        self.weights = SharedWeights(agent.get_learners(), context)
+        # A bounded queue stops the workers from running far ahead of the learner
+        self.queue = context.Queue(maxsize=2 * workers)
+        self.next_episode = context.Value("i", agent.current_ep)
+        self.episodes = agent.episodes
+        self.processes: list = []
+        for _ in range(workers):
+            process = context.Process(
+                target=async_rollout_worker,
+                args=(worker_agent, self.weights, self.queue, self.next_episode, agent.episodes, render_each),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+
+    def get(self) -> EpisodeResult:
+        return self.queue.get()
+
+    def get_version(self) -> int:
+        return self.weights.get_version()
+
+    def publish(self, agent) -> int:
+        return self.weights.publish(agent.get_learners())
+
+    def close(self) -> None:
+        # No new episodes are handed out. The results still coming are dropped, so no worker stays blocked on the
+        # bounded queue when the learner stopped before the last episode
+        with self.next_episode.get_lock():
+            self.next_episode.value = self.episodes
+        while any(process.is_alive() for process in self.processes):
+            try:
+                self.queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for process in self.processes:
+            process.join()
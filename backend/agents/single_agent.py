@@ -1,10 +1,9 @@
 import os
 
-import torch
-
 from aow.game.aow import ArtOfWar
 from buffer.episode import Episode
 from learnings.base import Learning
+from utils.checkpoint import write_checkpoint
 from .base import BaseAgent
 
 
@@ -16,8 +15,13 @@ class SingleAgent(BaseAgent):
             episodes: int,
             train_on: int,
             result_folder: str,
+            workers: int = 1,
+            asynchronous: bool = False,
+            max_staleness: int = 1,
+            num_envs: int = 1,
     ) -> None:
-        super().__init__(env, learner, episodes, train_on, result_folder)
+        super().__init__(env, learner, episodes, train_on, result_folder, workers, asynchronous, max_staleness,
+                         num_envs)
 
     def add_episodes(self, white: Episode, black: Episode) -> None:
         self.learner.remember(white)
@@ -30,5 +34,8 @@ class SingleAgent(BaseAgent):
         if not os.path.exists(self.result_folder):
             os.makedirs(self.result_folder)
 
-        self.learner.save(self.result_folder, "single_agent.pt")
-        torch.save(self.learner.state_dict(), f"{self.result_folder}/single_agent_dict.pt")
+        self.learner.save(self.result_folder, "single_agent")
+        write_checkpoint(self.learner.state_dict(), f"{self.result_folder}/single_agent_dict.pt")
+
+    def load_learners(self):
+        self.learner.load(self.result_folder, "single_agent")
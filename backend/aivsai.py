@@ -9,6 +9,7 @@ from agents import PlayAgent
 from aow.game.aow import ArtOfWar
 from buffer.episode import Episode
 from learnings.ppo import PPO
+from utils import getenv_flag
 
 load_dotenv()
 
@@ -30,6 +31,9 @@ ppo = PPO(
     gae_lambda=float(os.getenv("PPO_GAE_LAMBDA")),
     policy_clip=float(os.getenv("PPO_POLICY_CLIP")),
     learning_rate=float(os.getenv("PPO_LEARNING_RATE")),
+    shared=getenv_flag("PPO_SHARED"),
+    masked_logits=getenv_flag("PPO_MASKED_LOGITS"),
+    factorized=getenv_flag("PPO_FACTORIZED"),
 )
 
 # Create an instance of PlayAgent
@@ -0,0 +1,5 @@
+# Move generation engines of AoWLogic
+OBJECT = "object"
+BITBOARD = "bitboard"
+
+ENGINES = (OBJECT, BITBOARD)
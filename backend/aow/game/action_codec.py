@@ -0,0 +1,79 @@
+import numpy as np
+
+# Every action moves from a source to a destination cell, upgrades have both on the same cell, so a pair of squares is
+# all ArtOfWar.step uses of an action. Unlike the action ids, the pairs do not depend on where the pieces of a player
+# sit in the padded action space
+SQUARES = 64
+# The legal sources, then the legal destinations of every source
+TABLE_LENGTH = SQUARES + SQUARES * SQUARES
+# The bytes of a row of squares, the table to act with is packed to one bit per entry
+SQUARE_BYTES = SQUARES // 8
+# The legal sources, then the legal destinations of the source that was taken
+FACTORIZED_LENGTH = 2 * SQUARES
+
+
+class ActionCodec:
+    @staticmethod
+    def get_pairs(source_pos: np.ndarray, possibles: np.ndarray) -> np.ndarray:
+        """
+        Get the pair of every action id
+        :param source_pos: np.ndarray: The source positions of the actions, from AoWLogic.get_all_actions
+        :param possibles: np.ndarray: The next positions of the actions, from AoWLogic.get_all_actions
+        :return: np.ndarray: The pairs, source square * 64 + destination square
+        """
+        sources = source_pos[:, 0] * 8 + source_pos[:, 1]
+        destinations = possibles[:, 0] * 8 + possibles[:, 1]
+        return sources * SQUARES + destinations
+
+    @staticmethod
+    def get_table(source_pos: np.ndarray, possibles: np.ndarray, actions_mask: np.ndarray) -> np.ndarray:
+        """
+        Get the mask to act with, the legal sources followed by the legal destinations of every source
+        :param source_pos: np.ndarray: The source positions of the actions
+        :param possibles: np.ndarray: The next positions of the actions
+        :param actions_mask: np.ndarray: The mask of the action ids
+        :return: np.ndarray: The mask packed with np.packbits, shape (TABLE_LENGTH // 8,) of uint8
+        """
+        pairs = ActionCodec.get_pairs(source_pos, possibles)[actions_mask[:len(source_pos)].astype(bool)]
+        table = np.zeros(TABLE_LENGTH, dtype=bool)
+        table[pairs // SQUARES] = True
+        table[SQUARES + pairs] = True
+        return np.packbits(table)
+
+    @staticmethod
+    def get_mask(table: np.ndarray, pair: int) -> np.ndarray:
+        """
+        Get the mask to remember for a taken pair, only the destinations of its source are kept
+        :param table: np.ndarray: The packed mask the pair was chosen with, from get_table
+        :param pair: int: The taken pair
+        :return: np.ndarray: The mask, shape (FACTORIZED_LENGTH,)
+        """
+        start = SQUARE_BYTES + pair // SQUARES * SQUARE_BYTES
+        return np.unpackbits(np.concatenate((table[:SQUARE_BYTES], table[start:start + SQUARE_BYTES]))).astype(bool)
+
+    @staticmethod
+    def encode(action: int, source_pos: np.ndarray, possibles: np.ndarray) -> int:
+        """
+        Get the pair of an action id
+        :param action: int: The action id
+        :param source_pos: np.ndarray: The source positions of the actions
+        :param possibles: np.ndarray: The next positions of the actions
+        :return: int: The pair
+        """
+        return int(source_pos[action][0] * 8 + source_pos[action][1]) * SQUARES + int(
+            possibles[action][0] * 8 + possibles[action][1])
+
+    @staticmethod
+    def decode(pair: int, source_pos: np.ndarray, possibles: np.ndarray, actions_mask: np.ndarray) -> int:
+        """
+        Get a legal action id of a pair. Action ids with the same pair make the same move, so the first one is taken
+        :param pair: int: The pair
+        :param source_pos: np.ndarray: The source positions of the actions
+        :param possibles: np.ndarray: The next positions of the actions
+        :param actions_mask: np.ndarray: The mask of the action ids
+        :return: int: The action id
+        """
+        # The mask is padded to the action space, the positions stop at the last action
+        matches = (ActionCodec.get_pairs(source_pos, possibles) == pair) & actions_mask[:len(source_pos)].astype(bool)
+        assert matches.any(), f"No legal action for pair {pair}"
+        return int(matches.argmax())
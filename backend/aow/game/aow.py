@@ -1,8 +1,10 @@
 from typing import Union, Optional, List
 
 import gym
+import numpy as np
 from gym.core import RenderFrame
 
+import aow.constants.engines as Engines
 import aow.constants.rewards as Rewards
 from aow.game.aow_logic import AoWLogic
 from aow.models.board import AoWBoard
@@ -13,11 +15,13 @@ from aow.utils.pygame import PyGameUtils
 
 class ArtOfWar(gym.Env):
     def __init__(self, max_steps: int = 128, window_size: int = 800, render_mode: str = 'human',
-                 console_render: bool = False):
-        self.aow_board = AoWBoard()
+                 console_render: bool = False, engine: str = Engines.OBJECT, aow_board: AoWBoard | None = None):
+        self.aow_board = AoWBoard() if aow_board is None else aow_board
         self.pygame_utils = PyGameUtils(window_size=window_size, render_mode=render_mode)
-        self.aow_logic = AoWLogic(max_steps=max_steps, board=self.aow_board)
+        self.aow_logic = AoWLogic(max_steps=max_steps, board=self.aow_board, engine=engine)
         self.console_render = console_render
+        self.observation: tuple[np.ndarray, tuple] | None = None
+        self.observation_key: tuple | None = None
 
     def step(self, action: int) -> tuple[list[int], bool, list[set]]:
         assert not self.aow_logic.is_game_done(), "the game is finished reset"
@@ -46,6 +50,22 @@ class ArtOfWar(gym.Env):
         self.aow_logic.steps += 1
         return rewards, self.aow_logic.is_game_done(), infos
 
+    def observe(self) -> tuple[np.ndarray, tuple]:
+        """
+        Get the state and actions of the player to move. They are kept until the position, the turn or the resources
+        change, so the state is read-only and shared between callers. The actions were mostly computed by step already,
+        when it looked for check mates
+        :return: tuple[np.ndarray, tuple]: The state and the source positions, next positions and actions mask
+        """
+        turn = self.aow_logic.turn
+        key = (self.aow_board.get_version(), turn, tuple(self.aow_board.resources))
+        if key != self.observation_key:
+            state = self.aow_board.get_state(turn)
+            state.flags.writeable = False
+            self.observation = (state, self.aow_logic.get_all_actions(turn))
+            self.observation_key = key
+        return self.observation
+
     def handle_moves(self, from_pos: Cell, next_pos: Cell) -> tuple[list[int], list[set], bool]:
         if from_pos == next_pos and self.aow_board.get_piece(from_pos, self.aow_logic.turn).is_upgradable():
             return self.handle_same_position(from_pos)
@@ -87,7 +107,7 @@ class ArtOfWar(gym.Env):
         Render the environment
         :return: Optional[Union[RenderFrame, List[RenderFrame]]]: The rendered frame
         """
-        return self.pygame_utils.render(self.aow_board.get_numeric_board())
+        return self.pygame_utils.render(self.aow_board.get_board())
 
     def reset(self, **kwargs) -> None:
         """
@@ -1,21 +1,26 @@
 import numpy as np
 from gym import spaces
 
+import aow.constants.engines as Engines
 import aow.constants.info_keys as InfoKeys
 import aow.constants.rewards as Rewards
 import aow.models.pieces as pieces_module
 import aow.pieces as Pieces
+from aow.game.bitboard import BitboardEngine
 from aow.game.check import Check
 from aow.models.board import AoWBoard
 from aow.models.cards import DutchWaterline, WarElephantUpgradeCard, WingedKnightUpgradeCard, \
     HopliteUpgradeCard
+from aow.models.move_record import MoveRecord
 from aow.models.pieces import *
 from aow.models.types import Cell
 from aow.utils.cell import CellUtils
+from aow.utils.zobrist import Zobrist
 
 
 class AoWLogic:
-    def __init__(self, max_steps: int, board: AoWBoard):
+    def __init__(self, max_steps: int, board: AoWBoard, engine: str = Engines.OBJECT):
+        assert engine in Engines.ENGINES, f"engine must be one of {Engines.ENGINES}"
         self.action_space_length = 1200  # 3584
         self.action_space = spaces.Discrete(self.action_space_length)  # standard aow board has 1000 possible moves.
         self.observation_space = spaces.Box(0, 7, (128,), dtype=np.int32)
@@ -26,6 +31,10 @@ class AoWLogic:
         self.checked: list[bool] = [False, False]
         self.max_steps: int = max_steps
         self.aow_board = board
+        self.engine = engine
+        self.bitboard_engine = BitboardEngine(board)
+        self.actions_cache: dict[tuple, tuple] = {}
+        self.actions_cache_version: int = -1
 
     def get_source_pos(self, name: str, turn: int) -> np.ndarray:
         cat = name.split("_")[0]
@@ -54,18 +63,43 @@ class AoWLogic:
         all_actions_mask.append(actions_mask)
         return len(actions_mask)
 
-    def get_all_actions(self, turn: int, deny_enemy_king: bool = False):
-        all_possibles, all_source_pos, all_actions_mask = [], [], []
-
-        length = 0
-        for name in self.aow_board.pieces[turn].keys():
-            if name == "king_1" and deny_enemy_king:
-                continue
-
-            source_pos, possibles, actions_mask = self.get_actions_for(name, turn, deny_enemy_king)
+    def get_hash(self) -> int:
+        """
+        Get the Zobrist hash of the game state, the hash of the board combined with the side to move
+        :return: The 64-bit hash of the game state
+        """
+        return self.aow_board.get_hash() ^ Zobrist.get_turn_key(self.turn)
 
-            length += self.append_actions(all_source_pos, all_possibles, all_actions_mask, source_pos, possibles,
-                                          actions_mask)
+    def get_all_actions(self, turn: int, deny_enemy_king: bool = False):
+        """
+        Get the source positions, next positions and mask of all actions. The result is cached until the board
+        changes, so the arrays are read-only and shared between callers
+        :param turn: Turn of the player
+        :param deny_enemy_king: If moves onto the enemy king are allowed
+        :return: The source positions, next positions and actions mask
+        """
+        version = self.aow_board.get_version()
+        if version != self.actions_cache_version:
+            self.actions_cache = {}
+            self.actions_cache_version = version
+
+        # The card actions depend on the resources, which are not part of the board version
+        key = (turn, deny_enemy_king, self.aow_board.get_resources(turn))
+        if key not in self.actions_cache:
+            all_actions = self.compute_all_actions(turn, deny_enemy_king)
+            for actions in all_actions:
+                actions.flags.writeable = False
+            self.actions_cache[key] = all_actions
+        return self.actions_cache[key]
+
+    def compute_all_actions(self, turn: int, deny_enemy_king: bool = False):
+        if self.engine == Engines.BITBOARD:
+            all_source_pos, all_possibles, all_actions_mask = self.bitboard_engine.get_pieces_actions(
+                turn, deny_enemy_king)
+        else:
+            all_source_pos, all_possibles, all_actions_mask = self.get_pieces_actions(turn, deny_enemy_king)
+
+        length = sum(len(actions_mask) for actions_mask in all_actions_mask)
 
         for i in range(3):
             source_pos, possibles, actions_mask = self.get_card_upgrade_actions(turn, i)
@@ -89,6 +123,18 @@ class AoWLogic:
             np.concatenate(all_actions_mask),
         )
 
+    def get_pieces_actions(self, turn: int, deny_enemy_king: bool = False) -> tuple[list, list, list]:
+        all_possibles, all_source_pos, all_actions_mask = [], [], []
+
+        for name in self.aow_board.pieces[turn].keys():
+            if name == "king_1" and deny_enemy_king:
+                continue
+
+            source_pos, possibles, actions_mask = self.get_actions_for(name, turn, deny_enemy_king)
+            self.append_actions(all_source_pos, all_possibles, all_actions_mask, source_pos, possibles, actions_mask)
+
+        return all_source_pos, all_possibles, all_actions_mask
+
     def get_card_upgrade_actions(self, turn: int, card_id: int):
         match card_id:
             case 0:
@@ -151,50 +197,39 @@ class AoWLogic:
     def move_piece(self, src: Cell, dst: Cell, turn: int, temp: bool = True) -> tuple[list[int], list[set]]:
         src, dst = CellUtils.make_cell(src), CellUtils.make_cell(dst)
 
-        selected_piece = self.aow_board.get_piece(src, turn)
-        selected_piece.set_has_moved()
-
-        if self.aow_board.is_piece(1 - turn, Cell(7 - dst.row, dst.col), King()):
+        record = self.make_move(src, dst, turn)
+        if record.is_blocked():
             return [0, 0], [set(), set()]
 
-        # move piece
-        self.aow_board.set_piece(turn, src, Empty())
-        self.aow_board.set_piece(turn, dst, selected_piece)
-
-        # remove enemy piece in position
-        self.aow_board.set_piece(1 - turn, Cell(7 - dst.row, dst.col), Empty())
-
         # Set default rewards, [-1, -2], -1 for the player who moved the piece, -2 for the other player
         rewards = [Rewards.MOVE, Rewards.MOVE]
         rewards[1 - turn] *= 0
 
-        # Check some special moves like castling and pawn capture by warelephant
-        self.capture_pawn_by_warelephant(dst.row, dst.col, src.row, src.col, turn)
-        self.castle(src, dst, turn)
-
-        for (key, value) in self.aow_board.pieces[turn].items():
-            if value == tuple(src):
-                # # Update the location of the piece in the pieces array
-                self.aow_board.pieces[turn][key] = (dst.row, dst.col)
-
-        for (key, value) in self.aow_board.pieces[1 - turn].items():
-            if value == (7 - dst[0], dst[1]):
-                # Remove the location from the piece that was removed in the pieces array
-                self.aow_board.pieces[1 - turn][key] = None
-
-                # add a reward for capturing a piece
-                selected_piece = key.split("_")[0]
-                selected_piece = selected_piece.upper()
-
-                # get the reward from the rewards.py based on the name of the piece
-                reward = getattr(Rewards, selected_piece)
-                rewards = self.add_reward(rewards, reward, turn)
+        for _, piece in record.get_captured():
+            rewards = self.add_reward(rewards, piece.get_reward(), turn)
 
         if not temp:
             self.promote_pawn_or_hoplite(dst, turn)
 
         return rewards, [set(), set()]
 
+    def make_move(self, src: Cell, dst: Cell, turn: int) -> MoveRecord:
+        """
+        Make a move on the board in place without rewards or promotion
+        :param src: Position of the piece
+        :param dst: Position to move the piece to
+        :param turn: Turn of the player
+        :return: The undo record to take the move back with unmake_move
+        """
+        return self.aow_board.make_move(turn, src, dst)
+
+    def unmake_move(self, record: MoveRecord):
+        """
+        Take back a move made with make_move
+        :param record: The undo record returned by make_move
+        """
+        self.aow_board.unmake_move(record)
+
     @staticmethod
     def add_reward(rewards: list[int] = None, reward: int = 0, turn: int = 1) -> list:
         rewards = [Rewards.MOVE, Rewards.MOVE] if rewards is None else rewards
@@ -202,24 +237,6 @@ class AoWLogic:
         rewards[1 - turn] += -reward
         return rewards
 
-    def capture_pawn_by_warelephant(self, next_row: int, next_col: int, current_row: int, current_col: int, turn: int):
-        if self.aow_board.is_piece(turn, Cell(next_row, next_col), Warelephant()):
-            min_row, max_row = min(current_row, next_row), max(current_row, next_row)
-            min_col, max_col = min(current_col, next_col), max(current_col, next_col)
-
-            self.capture_pawn_in_rows(min_row, max_row, current_col, turn)
-            self.capture_pawn_in_cols(min_col, max_col, current_row, turn)
-
-    def capture_pawn_in_rows(self, min_row: int, max_row: int, current_col: int, turn: int):
-        for r in range(min_row + 1, max_row):
-            if self.aow_board.is_piece(1 - turn, Cell(7 - r, current_col), Pawn()):
-                self.aow_board.set_piece(1 - turn, Cell(7 - r, current_col), Empty())
-
-    def capture_pawn_in_cols(self, min_col: int, max_col: int, current_row: int, turn: int):
-        for c in range(min_col + 1, max_col):
-            if self.aow_board.is_piece(1 - turn, Cell(7 - current_row, c), Pawn()):
-                self.aow_board.set_piece(1 - turn, Cell(7 - current_row, c), Empty())
-
     def is_game_done(self):
         return self.done or (self.steps >= self.max_steps)
 
@@ -282,18 +299,11 @@ class AoWLogic:
         return new_piece
 
     def get_piece_name_from_position(self, pos: Cell, turn: int):
-        piece_name = None
-        for key, value in self.aow_board.pieces[turn].items():
-            if value == (pos.row, pos.col):
-                piece_name = key
-                break
-        return piece_name
+        return self.aow_board.get_piece_name(turn, pos)
 
     def update_piece_in_board(self, new_piece, piece_name, turn, pos):
-        self.aow_board.pieces[turn][f"{new_piece.get_name().lower()}_{piece_name.split('_')[1]}"] = \
-            self.aow_board.pieces[turn].pop(piece_name)
-        new_piece.set_has_moved(True)
-        self.aow_board.set_piece(turn, pos, new_piece)
+        self.aow_board.rename_piece(turn, piece_name, f"{new_piece.get_name().lower()}_{piece_name.split('_')[1]}")
+        self.aow_board.set_piece(turn, pos, new_piece, has_moved=True)
 
     def remove_resources(self, turn: int, selected_piece: Piece):
         match selected_piece.get_piece_number():
@@ -303,17 +313,3 @@ class AoWLogic:
                 self.aow_board.remove_resources(turn, 3)
             case Pieces.WARELEPHANT:
                 self.aow_board.remove_resources(turn, 5)
-
-    def castle(self, current_pos: Cell, next_pos: Cell, turn: int):
-        current_pos = CellUtils.make_cell(current_pos)
-        next_pos = CellUtils.make_cell(next_pos)
-
-        if self.aow_board.is_piece(turn, next_pos, King()) and (next_pos.col == 2 or next_pos.col == 6):
-            if current_pos.col - next_pos.col == 2:
-                self.aow_board.set_piece(turn, Cell(current_pos.row, 3),
-                                         self.aow_board.get_piece(Cell(current_pos.row, 0), turn))
-                self.aow_board.set_piece(turn, Cell(current_pos.row, 0), Empty())
-            elif current_pos.col - next_pos.col == -2:
-                self.aow_board.set_piece(turn, Cell(current_pos.row, 5),
-                                         self.aow_board.get_piece(Cell(current_pos.row, 7), turn))
-                self.aow_board.set_piece(turn, Cell(current_pos.row, 7), Empty())
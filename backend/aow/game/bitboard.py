@@ -0,0 +1,369 @@
+import numpy as np
+
+import aow.constants.moves as Moves
+import aow.pieces as Pieces
+from aow.models import Cell
+from aow.models.pieces import Pawn, Bishop, Knight, Rook, Queen, King, Wingedknight, Hoplite, Warelephant
+
+PIECE_CLASSES = (Pawn, Bishop, Knight, Rook, Queen, King, Wingedknight, Hoplite, Warelephant)
+
+PIECE_MOVES = {piece().get_piece_number(): piece().get_moves() for piece in PIECE_CLASSES}
+POSSIBLES_SIZE = {piece().get_piece_number(): piece().get_possibles_size() for piece in PIECE_CLASSES}
+JUMPING_PIECES = tuple(piece().get_piece_number() for piece in PIECE_CLASSES if piece().can_jump())
+
+DIAGONALS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+STRAIGHTS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def is_in_range(row: int, col: int) -> bool:
+    return 0 <= row < 8 and 0 <= col < 8
+
+
+def bit(row: int, col: int) -> int:
+    return 1 << (row * 8 + col)
+
+
+def lowest_square(bb: int) -> int:
+    return (bb & -bb).bit_length() - 1
+
+
+def build_ray(sq: int, direction: tuple[int, int]) -> tuple[int, bool]:
+    """
+    Build the ray of squares from a square into one direction, the square itself is not part of the ray
+    @param sq: int: The square to start from
+    @param direction: tuple[int, int]: The (row, col) direction of the ray
+    @return: tuple[int, bool]: The bitboard of the ray and if the ray walks towards higher squares
+    """
+    dr, dc = direction
+    row, col = divmod(sq, 8)
+    ray = 0
+    row, col = row + dr, col + dc
+    while is_in_range(row, col):
+        ray |= bit(row, col)
+        row, col = row + dr, col + dc
+    return ray, dr * 8 + dc > 0
+
+
+def build_jumps(sq: int, offsets: tuple) -> int:
+    row, col = divmod(sq, 8)
+    bb = 0
+    for dr, dc in offsets:
+        if is_in_range(row + dr, col + dc):
+            bb |= bit(row + dr, col + dc)
+    return bb
+
+
+def build_path(src: int, dst: int) -> int:
+    """
+    Build the bitboard of the path between two squares, this follows AoWBoard.get_path so moves that are not on a
+    line (like the knight) get the same partial path
+    @param src: int: The square the piece moves from
+    @param dst: int: The square the piece moves to
+    @return: int: The bitboard of the squares in between
+    """
+    src_row, src_col = divmod(src, 8)
+    dst_row, dst_col = divmod(dst, 8)
+    diff_row, diff_col = dst_row - src_row, dst_col - src_col
+    size = max(abs(diff_row), abs(diff_col)) - 1
+    sign_row = (diff_row > 0) - (diff_row < 0)
+    sign_col = (diff_col > 0) - (diff_col < 0)
+
+    rows = range(src_row + sign_row, dst_row, sign_row) if diff_row else [dst_row] * max(size, 0)
+    cols = range(src_col + sign_col, dst_col, sign_col) if diff_col else [dst_col] * max(size, 0)
+
+    bb = 0
+    for row, col in zip(rows, cols):
+        bb |= bit(row, col)
+    return bb
+
+
+def build_sweep(src: int, dst: int) -> int:
+    """
+    Build the bitboard of the squares of which a war elephant captures the pawns, see AoWLogic.capture_pawn_by_warelephant
+    @param src: int: The square the war elephant moves from
+    @param dst: int: The square the war elephant moves to
+    @return: int: The bitboard of the swept squares
+    """
+    src_row, src_col = divmod(src, 8)
+    dst_row, dst_col = divmod(dst, 8)
+    bb = 0
+    for row in range(min(src_row, dst_row) + 1, max(src_row, dst_row)):
+        bb |= bit(row, src_col)
+    for col in range(min(src_col, dst_col) + 1, max(src_col, dst_col)):
+        bb |= bit(src_row, col)
+    return bb
+
+
+def build_candidates(piece: int) -> list[list[tuple]]:
+    """
+    Build the candidate moves of a piece for every square
+    @param piece: int: The piece number
+    @return: list[list[tuple]]: For every square a list of (index, destination square, destination cell, path, sweep)
+    """
+    candidates = []
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        moves = []
+        for i, (dr, dc) in enumerate(PIECE_MOVES[piece]):
+            if not is_in_range(row + dr, col + dc):
+                continue
+            dst = (row + dr) * 8 + col + dc
+            moves.append((i, dst, Cell(row + dr, col + dc), build_path(sq, dst), build_sweep(sq, dst)))
+        candidates.append(moves)
+    return candidates
+
+
+RAYS = tuple(tuple(build_ray(sq, direction) for direction in DIAGONALS + STRAIGHTS) for sq in range(64))
+KNIGHT_ATTACKS = tuple(build_jumps(sq, Moves.KNIGHT) for sq in range(64))
+WINGED_KNIGHT_ATTACKS = tuple(build_jumps(sq, Moves.WINGED_KNIGHT) for sq in range(64))
+PAWN_ATTACKS = tuple(build_jumps(sq, ((1, 1), (1, -1))) for sq in range(64))
+HOPLITE_ATTACKS = tuple(build_jumps(sq, ((1, 0),)) for sq in range(64))
+CANDIDATES = {piece: build_candidates(piece) for piece in PIECE_MOVES}
+
+
+class BitboardPosition:
+    def __init__(self, board: 'AoWBoard', turn: int):
+        """
+        Snapshot of the Art of War board as bitboards, seen from the side of the player
+        @param board: AoWBoard: The Art of War board
+        @param turn: int: The player (Can be 0 or 1) whose coordinates are used
+        """
+        self.turn = turn
+        self.own_pieces: list[int] = board.get_board()[turn].ravel().tolist()
+        # The enemy side is flipped, so a square means the same cell for both sides
+        self.enemy_pieces: list[int] = board.get_board()[1 - turn, ::-1].ravel().tolist()
+
+        self.own = [0] * 10
+        self.enemy = [0] * 10
+        for sq in range(64):
+            self.own[self.own_pieces[sq]] |= 1 << sq
+            self.enemy[self.enemy_pieces[sq]] |= 1 << sq
+
+        self.own_occupied = ~self.own[Pieces.EMPTY] & 0xFFFFFFFFFFFFFFFF
+        self.enemy_occupied = ~self.enemy[Pieces.EMPTY] & 0xFFFFFFFFFFFFFFFF
+        self.occupied = self.own_occupied | self.enemy_occupied
+
+    def is_attacked(self, sq: int, occupied: int, captured: int = 0) -> bool:
+        """
+        Check if a square of the player is attacked by the enemy, the same rules as Check.is_check
+        @param sq: int: The square to check
+        @param occupied: int: The occupied squares of both sides
+        @param captured: int: The enemy pieces that are removed from the board
+        @return: bool: If the square is attacked
+        """
+        enemy = self.enemy
+        alive = ~captured
+        if PAWN_ATTACKS[sq] & (enemy[Pieces.PAWN] | enemy[Pieces.HOPLITE]) & alive:
+            return True
+        if HOPLITE_ATTACKS[sq] & enemy[Pieces.HOPLITE] & alive:
+            return True
+        if KNIGHT_ATTACKS[sq] & enemy[Pieces.KNIGHT] & alive:
+            return True
+        if WINGED_KNIGHT_ATTACKS[sq] & enemy[Pieces.WINGED_KNIGHT] & alive:
+            return True
+
+        diagonal = (enemy[Pieces.BISHOP] | enemy[Pieces.QUEEN]) & alive
+        straight = (enemy[Pieces.ROOK] | enemy[Pieces.QUEEN] | enemy[Pieces.WARELEPHANT]) & alive
+        for i, (ray, forward) in enumerate(RAYS[sq]):
+            blockers = ray & occupied
+            if not blockers:
+                continue
+            first = blockers & -blockers if forward else 1 << (blockers.bit_length() - 1)
+            if first & (diagonal if i < 4 else straight):
+                return True
+        return False
+
+    def is_lead_to_check(self, src: int, dst: int, sweep: int) -> bool:
+        """
+        Check if a move leaves the king of the player in check, the same rules as AoWBoard.is_lead_to_check
+        @param src: int: The square the piece moves from
+        @param dst: int: The square the piece moves to
+        @param sweep: int: The squares a war elephant captures pawns on
+        @return: bool: If the move leads to a check
+        """
+        own_king = self.own[Pieces.KING]
+        if self.enemy_pieces[dst] == Pieces.KING:
+            return self.is_attacked(lowest_square(own_king), self.occupied)
+
+        piece = self.own_pieces[src]
+        src_bit, dst_bit = 1 << src, 1 << dst
+        own_occupied = self.own_occupied & ~src_bit
+        if piece != Pieces.EMPTY:
+            own_occupied |= dst_bit
+
+        captured = dst_bit
+        if piece == Pieces.WARELEPHANT:
+            captured |= sweep & self.enemy[Pieces.PAWN]
+
+        if piece == Pieces.KING:
+            own_king = own_king & ~src_bit | dst_bit
+            # Only a king on (0, 4) castles, with a rook on the corner
+            if src == 4 and dst == 2 and self.own[Pieces.ROOK] & 1:
+                own_occupied, own_king = self.move_rook(own_occupied, own_king, 0, 3)
+            elif src == 4 and dst == 6 and self.own[Pieces.ROOK] & 1 << 7:
+                own_occupied, own_king = self.move_rook(own_occupied, own_king, 7, 5)
+
+        occupied = own_occupied | (self.enemy_occupied & ~captured)
+        return self.is_attacked(lowest_square(own_king), occupied, captured)
+
+    def move_rook(self, own_occupied: int, own_king: int, src: int, dst: int) -> tuple[int, int]:
+        """
+        Move the rook next to a castling king, the same rules as AoWBoard.castle
+        @param own_occupied: int: The occupied squares of the player
+        @param own_king: int: The king of the player
+        @param src: int: The square the rook moves from
+        @param dst: int: The square the rook moves to
+        @return: tuple[int, int]: The occupied squares and the king after the move
+        """
+        src_bit, dst_bit = 1 << src, 1 << dst
+        own_occupied &= ~dst_bit
+        own_king &= ~dst_bit
+        if own_occupied & src_bit:
+            own_occupied |= dst_bit
+            if own_king & src_bit:
+                own_king |= dst_bit
+        own_occupied &= ~src_bit
+        own_king &= ~src_bit
+        return own_occupied, own_king
+
+
+class BitboardEngine:
+    def __init__(self, board: 'AoWBoard'):
+        """
+        Move generator that keeps the pieces of both sides as 64-bit bitboards. The actions are the same as the ones of
+        the pieces themselves, including the layout of the action space
+        @param board: AoWBoard: The Art of War board
+        """
+        self.aow_board = board
+
+    def get_pieces_actions(self, turn: int, deny_enemy_king: bool = False) -> tuple:
+        """
+        Get the actions of all the pieces of the player in the order of the pieces of the board
+        @param turn: int: The player (Can be 0 or 1)
+        @param deny_enemy_king: bool: If the enemy king may be taken
+        @return: tuple: The source positions, possible positions and action mask
+        """
+        position = BitboardPosition(self.aow_board, turn)
+
+        all_source_pos, all_possibles, all_actions_mask = [], [], []
+        for name, (piece, row, col) in zip(self.aow_board.slot_names[turn], self.aow_board.slots[turn].tolist()):
+            if name == "king_1" and deny_enemy_king:
+                continue
+
+            pos = None if row < 0 else (row, col)
+            size = POSSIBLES_SIZE[piece]
+            possibles = np.zeros((size, 2), dtype=np.int32)
+            actions_mask = np.zeros(size, dtype=np.int32)
+
+            if pos is None:
+                all_source_pos.append(np.zeros((size, 2), dtype=np.int64))
+            else:
+                all_source_pos.append(np.array([pos] * size))
+                if piece == Pieces.KING:
+                    moves = self.get_king_moves(position, Cell(*pos), self.aow_board.get_king_position(1 - turn))
+                elif piece == Pieces.PAWN or piece == Pieces.HOPLITE:
+                    moves = self.get_pawn_moves(position, piece, Cell(*pos), deny_enemy_king)
+                else:
+                    moves = self.get_moves(position, piece, Cell(*pos), deny_enemy_king)
+
+                for i, next_pos in moves:
+                    possibles[i] = next_pos
+                    actions_mask[i] = 1
+
+            all_possibles.append(possibles)
+            all_actions_mask.append(actions_mask)
+
+        return all_source_pos, all_possibles, all_actions_mask
+
+    def get_valid_move(self, position: BitboardPosition, pos: Cell, deny_enemy_king: bool) -> callable:
+        """
+        Get the validation of the moves of a piece, the same rules as AoWBoard.is_valid_move
+        @param position: BitboardPosition: The bitboards of the board
+        @param pos: Cell: The position of the piece
+        @param deny_enemy_king: bool: If the enemy king may be taken
+        @return: callable: Checks a move with the destination, path and sweep of the move
+        """
+        src = pos.row * 8 + pos.col
+        if position.own_pieces[src] == Pieces.WARELEPHANT:
+            blocking, jump = position.own_occupied | (position.enemy_occupied & ~position.enemy[Pieces.PAWN]), False
+        else:
+            blocking, jump = position.occupied, position.own_pieces[src] in JUMPING_PIECES
+
+        def is_valid_move(dst: int, path: int, sweep: int) -> bool:
+            if position.own_pieces[dst] != Pieces.EMPTY:
+                return False
+            if position.enemy_pieces[dst] == Pieces.KING and not deny_enemy_king:
+                return False
+            if not jump and path & blocking:
+                return False
+            return not position.is_lead_to_check(src, dst, sweep)
+
+        return is_valid_move
+
+    def get_moves(self, position: BitboardPosition, piece: int, pos: Cell, deny_enemy_king: bool) -> list:
+        is_valid_move = self.get_valid_move(position, pos, deny_enemy_king)
+        return [(i, next_pos) for i, dst, next_pos, path, sweep in CANDIDATES[piece][pos.row * 8 + pos.col]
+                if is_valid_move(dst, path, sweep)]
+
+    def get_pawn_moves(self, position: BitboardPosition, piece: int, pos: Cell, deny_enemy_king: bool) -> list:
+        is_valid_move = self.get_valid_move(position, pos, deny_enemy_king)
+        moves = []
+        for i, dst, next_pos, path, sweep in CANDIDATES[piece][pos.row * 8 + pos.col]:
+            if not is_valid_move(dst, path, sweep):
+                continue
+            if i == 0 and piece == Pieces.PAWN and position.occupied & (1 << dst):
+                continue
+            if i != 0 and not position.enemy_occupied & (1 << dst):
+                continue
+            moves.append((i, next_pos))
+
+        # add 2 to front move, when piece has not moved
+        if pos.row == 1:
+            dst = (pos.row + 2) * 8 + pos.col
+            path = 1 << (dst - 8)
+            if not position.occupied & (path | 1 << dst) and is_valid_move(dst, path, path):
+                moves.append((3, Cell(pos.row + 2, pos.col)))
+        return moves
+
+    def get_king_moves(self, position: BitboardPosition, pos: Cell, enemy_king: Cell) -> list:
+        is_valid_move = self.get_valid_move(position, pos, False)
+        moves = []
+        for i, dst, next_pos, path, sweep in CANDIDATES[Pieces.KING][pos.row * 8 + pos.col]:
+            # The castling moves are only checked by can_castle
+            if i < 8 and not is_valid_move(dst, path, sweep):
+                continue
+
+            if abs(next_pos.row - (7 - enemy_king.row)) <= 1 and abs(next_pos.col - enemy_king.col) <= 1:
+                continue
+
+            if i == 8 and not self.can_castle(position, pos, Cell(pos.row, pos.col + 3)):
+                continue
+
+            if i == 9 and not self.can_castle(position, pos, Cell(pos.row, pos.col - 4)):
+                continue
+
+            moves.append((i, next_pos))
+        return moves
+
+    def can_castle(self, position: BitboardPosition, king_pos: Cell, rook_pos: Cell) -> bool:
+        """
+        Check if the king can castle with the rook, the same rules as King.can_castle
+        @param position: BitboardPosition: The bitboards of the board
+        @param king_pos: Cell: The position of the king
+        @param rook_pos: Cell: The position of the rook
+        @return: bool: If the king can castle
+        """
+        if not is_in_range(*king_pos) or not is_in_range(*rook_pos):
+            return False
+
+        king, rook = king_pos.row * 8 + king_pos.col, rook_pos.row * 8 + rook_pos.col
+        if position.own_pieces[rook] != Pieces.ROOK or position.own_pieces[4] != Pieces.KING:
+            return False
+
+        if position.is_attacked(king, position.occupied):
+            return False
+
+        if self.aow_board.has_moved(position.turn, king_pos) or (king_pos.row != 0 and king_pos.col != 4):
+            return False
+
+        return not build_path(king, rook) & position.occupied
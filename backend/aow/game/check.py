@@ -1,202 +1,104 @@
+import aow.constants.moves as Moves
+import aow.pieces as Pieces
 from aow.models import Cell
-from aow.models.pieces.bishop import Bishop
-from aow.models.pieces.hoplite import Hoplite
-from aow.models.pieces.knight import Knight
-from aow.models.pieces.pawn import Pawn
-from aow.models.pieces.queen import Queen
-from aow.models.pieces.rook import Rook
-from aow.models.pieces.war_elephant import Warelephant
-from aow.models.pieces.winged_knight import Wingedknight
 from aow.utils.cell import CellUtils
 
+DIAGONAL_PIECES = (Pieces.BISHOP, Pieces.QUEEN)
+STRAIGHT_PIECES = (Pieces.ROOK, Pieces.QUEEN, Pieces.WARELEPHANT)
+PAWN_PIECES = (Pieces.PAWN, Pieces.HOPLITE)
+
+
+def build_ray(row: int, col: int, d_row: int, d_col: int) -> tuple[int, ...]:
+    """
+    Build the squares from a cell in one direction up to the edge of the board, a square is row * 8 + col
+    @param row: int: The row of the cell
+    @param col: int: The column of the cell
+    @param d_row: int: The row direction
+    @param d_col: int: The column direction
+    @return: tuple[int, ...]: The squares of the ray, nearest first
+    """
+    ray = []
+    row, col = row + d_row, col + d_col
+    while 0 <= row < 8 and 0 <= col < 8:
+        ray.append(row * 8 + col)
+        row, col = row + d_row, col + d_col
+    return tuple(ray)
+
+
+def build_attackers(row: int, col: int, offsets: tuple) -> tuple[int, ...]:
+    """
+    Build the squares a jumping piece can attack a cell from
+    @param row: int: The row of the cell
+    @param col: int: The column of the cell
+    @param offsets: tuple: The offsets from the cell to the attacker
+    @return: tuple[int, ...]: The squares on the board
+    """
+    return tuple((row + r) * 8 + col + c for r, c in offsets if 0 <= row + r < 8 and 0 <= col + c < 8)
+
+
+def build_rays(directions: tuple) -> tuple[tuple[tuple[int, ...], ...], ...]:
+    """
+    Build the rays in the directions for every square, empty rays are left out
+    @param directions: tuple: The (row, col) directions
+    @return: tuple: The rays of every square
+    """
+    return tuple(tuple(ray for ray in (build_ray(sq // 8, sq % 8, r, c) for r, c in directions) if ray)
+                 for sq in range(64))
+
+
+# Every table is indexed with the square of the attacked cell, seen from the attacked player
+DIAGONAL_RAYS = build_rays(((1, 1), (1, -1), (-1, 1), (-1, -1)))
+STRAIGHT_RAYS = build_rays(((1, 0), (-1, 0), (0, 1), (0, -1)))
+KNIGHT_ATTACKERS = tuple(build_attackers(sq // 8, sq % 8, Moves.KNIGHT) for sq in range(64))
+WINGED_KNIGHT_ATTACKERS = tuple(build_attackers(sq // 8, sq % 8, Moves.WINGED_KNIGHT) for sq in range(64))
+PAWN_ATTACKERS = tuple(build_attackers(sq // 8, sq % 8, ((1, 1), (1, -1))) for sq in range(64))
+HOPLITE_ATTACKERS = tuple(build_attackers(sq // 8, sq % 8, ((1, 0),)) for sq in range(64))
+
 
 class Check:
     def __init__(self, board):
         self.aow_board = board
 
     def is_check(self, king_pos: Cell, turn: int) -> bool:
-        king_pos = CellUtils.make_cell(king_pos)
-
-        diagonal_pieces = (Bishop, Queen)
-        straight_pieces = (Rook, Queen, Warelephant)
-
-        if self.is_check_diagonals(king_pos, diagonal_pieces, turn):
-            return True
-
-        if self.is_check_horizontal(king_pos, straight_pieces, turn):
-            return True
-
-        if self.is_check_verticals(king_pos, straight_pieces, turn):
-            return True
-
-        if self.is_check_knight(king_pos, turn):
-            return True
-
-        if self.is_check_winged_knight(king_pos, turn):
-            return True
-
-        return False
-
-    def is_check_horizontal(self, king_pos: Cell, pieces_to_check: tuple, turn: int) -> bool:
-        if self.is_check_left(king_pos, pieces_to_check, turn):
-            return True
-
-        if self.is_check_right(king_pos, pieces_to_check, turn):
-            return True
-
-        return False
-
-    def is_check_left(self, king_pos: Cell, pieces_to_check: tuple, turn: int) -> bool:
-        for c in range(king_pos.col - 1, -1, -1):
-            if self.aow_board.is_tile_empty_on_both_side(Cell(king_pos.row, c), turn):
-                continue
-            p = self.aow_board.get_piece(Cell(7 - king_pos.row, c), 1 - turn)
-            if isinstance(p, pieces_to_check):
-                return True
-            break
-        return False
-
-    def is_check_right(self, king_pos: Cell, pieces_to_check: tuple, turn: int) -> bool:
-        for c in range(king_pos.col + 1, 8):
-            if self.aow_board.is_tile_empty_on_both_side(Cell(king_pos.row, c), turn):
-                continue
-            p = self.aow_board.get_piece(Cell(7 - king_pos.row, c), 1 - turn)
-            if isinstance(p, pieces_to_check):
-                return True
-            break
-        return False
-
-    def is_check_verticals(self, king_pos: Cell, pieces_to_check: tuple, turn: int) -> bool:
-        if self.is_check_vertical(king_pos, pieces_to_check, turn, 1):
-            return True
-
-        if self.is_check_vertical(king_pos, pieces_to_check, turn, -1):
-            return True
-
-        return False
-
-    def is_check_vertical(self, king_pos: Cell, pieces_to_check: tuple, turn: int, direction: int) -> bool:
-        start, end, step = (king_pos.row + 1, 8, 1) if direction == 1 else (king_pos.row - 1, -1, -1)
-        for r in range(start, end, step):
-            d = r - king_pos.row
-            if self.aow_board.is_tile_empty_on_both_side(Cell(r, king_pos.col), turn):
-                continue
-            p = self.aow_board.get_piece(Cell(7 - r, king_pos.col), 1 - turn)
-            if isinstance(p, pieces_to_check):
+        return self.attacked_by(CellUtils.make_cell(king_pos), 1 - turn)
+
+    def attacked_by(self, square: Cell, side: int) -> bool:
+        """
+        Check if a cell is attacked by the pieces of a player. Pawns and hoplites attack the cells in front of them,
+        hoplites also straight ahead, and kings do not attack
+        @param square: Cell: The cell, seen from the player that is attacked
+        @param side: int: The attacking player (Can be 0 or 1)
+        @return: bool: If the cell is attacked
+        """
+        board = self.aow_board.get_board()
+        sq = square.row * 8 + square.col
+        # The attacker's side is flipped, so both lists use the squares of the attacked player
+        enemy = board[side, ::-1].ravel().tolist()
+
+        for attacker in KNIGHT_ATTACKERS[sq]:
+            if enemy[attacker] == Pieces.KNIGHT:
                 return True
 
-            if d == 1 and isinstance(p, Hoplite):
+        for attacker in WINGED_KNIGHT_ATTACKERS[sq]:
+            if enemy[attacker] == Pieces.WINGED_KNIGHT:
                 return True
-            break
-        return False
-
-    def is_check_diagonals(self, king_pos: Cell, pieces_to_check: tuple, turn: int) -> bool:
-        return (self.is_check_diagonal_down(king_pos, pieces_to_check, turn) or
-                self.is_check_diagonal_up(king_pos, pieces_to_check, turn))
-
-    def is_check_diagonal_up(self, king_pos: Cell, pieces_to_check: tuple, turn: int) -> bool:
-        return (self.is_check_diagonal_up_right(king_pos, pieces_to_check, turn) or
-                self.is_check_diagonal_up_left(king_pos, pieces_to_check, turn))
-
-    def is_check_diagonal_down(self, king_pos: Cell, pieces_to_check: tuple, turn: int) -> bool:
-        return (self.is_check_diagonal_down_right(king_pos, pieces_to_check, turn) or
-                self.is_check_diagonal_down_left(king_pos, pieces_to_check, turn))
 
-    def is_check_diagonal_up_right(self, king_pos: Cell, pieces_to_check: tuple, turn: int) -> bool:
-        for r in range(king_pos.row - 1, -1, -1):
-            d = r - king_pos.row
-            if not self.aow_board.is_in_range(Cell(r, king_pos.col + d)):
-                break
-
-            if self.aow_board.is_tile_empty_on_both_side(Cell(r, king_pos.col + d), turn):
-                continue
-
-            p = self.aow_board.get_piece(Cell(7 - r, king_pos.col + d), 1 - turn)
-
-            if isinstance(p, pieces_to_check):
+        for attacker in PAWN_ATTACKERS[sq]:
+            if enemy[attacker] in PAWN_PIECES:
                 return True
 
-            if d == 1 and (isinstance(p, Pawn) or isinstance(p, Hoplite)):
+        for attacker in HOPLITE_ATTACKERS[sq]:
+            if enemy[attacker] == Pieces.HOPLITE:
                 return True
 
-            break
-        return False
-
-    def is_check_diagonal_up_left(self, king_pos: Cell, pieces_to_check: tuple, turn: int) -> bool:
-        for r in range(king_pos.row - 1, -1, -1):
-            d = r - king_pos.row
-            if not self.aow_board.is_in_range(Cell(r, king_pos.col - d)):
-                break
-
-            if self.aow_board.is_tile_empty_on_both_side(Cell(r, king_pos.col - d), turn):
-                continue
-
-            p = self.aow_board.get_piece(Cell(7 - r, king_pos.col - d), 1 - turn)
-
-            if isinstance(p, pieces_to_check):
-                return True
-
-            if d == 1 and (isinstance(p, Pawn) or isinstance(p, Hoplite)):
-                return True
-
-            break
-        return False
-
-    def is_check_diagonal_down_right(self, king_pos: Cell, pieces_to_check: tuple, turn: int) -> bool:
-        for r in range(king_pos.row + 1, 8):
-            d = r - king_pos.row
-            if not self.aow_board.is_in_range(Cell(r, king_pos.col + d)):
-                break
-
-            if self.aow_board.is_tile_empty_on_both_side(Cell(r, king_pos.col + d), turn):
-                continue
-
-            p = self.aow_board.get_piece(Cell(7 - r, king_pos.col + d), 1 - turn)
-
-            if isinstance(p, pieces_to_check):
-                return True
-
-            if d == 1 and (isinstance(p, Pawn) or isinstance(p, Hoplite)):
-                return True
-            break
-        return False
-
-    def is_check_diagonal_down_left(self, king_pos: Cell, pieces_to_check: tuple, turn: int) -> bool:
-        for r in range(king_pos.row + 1, 8):
-            d = r - king_pos.row
-            if not self.aow_board.is_in_range(Cell(r, king_pos.col - d)):
-                break
-
-            if self.aow_board.is_tile_empty_on_both_side(Cell(r, king_pos.col - d), turn):
-                continue
-
-            p = self.aow_board.get_piece(Cell(7 - r, king_pos.col - d), 1 - turn)
-
-            if isinstance(p, pieces_to_check):
-                return True
-
-            if d == 1 and (isinstance(p, Pawn) or isinstance(p, Hoplite)):
-                return True
-
-            break
-        return False
-
-    def is_check_knight(self, king_pos: Cell, turn: int) -> bool:
-        # KNIGHTS
-        for r, c in Knight().get_moves():
-            nr, nc = king_pos.row + r, king_pos.col + c
-            if not self.aow_board.is_in_range(Cell(nr, nc)):
-                continue
-            if self.aow_board.is_piece(1 - turn, Cell(7 - nr, nc), Knight()):
-                return True
-        return False
-
-    def is_check_winged_knight(self, king_pos: Cell, turn: int) -> bool:
-        # WINGED KNIGHTS
-        for r, c in Wingedknight().get_moves():
-            nr, nc = king_pos.row + r, king_pos.col + c
-            if not self.aow_board.is_in_range(Cell(nr, nc)):
-                continue
-            if self.aow_board.is_piece(1 - turn, Cell(7 - nr, nc), Wingedknight()):
-                return True
+        own = board[1 - side].ravel().tolist()
+        for rays, pieces in ((DIAGONAL_RAYS[sq], DIAGONAL_PIECES), (STRAIGHT_RAYS[sq], STRAIGHT_PIECES)):
+            for ray in rays:
+                for attacker in ray:
+                    if enemy[attacker] != Pieces.EMPTY:
+                        if enemy[attacker] in pieces:
+                            return True
+                        break
+                    if own[attacker] != Pieces.EMPTY:
+                        break
         return False
@@ -0,0 +1,118 @@
+import numpy as np
+
+import aow.constants.engines as Engines
+import aow.pieces as Pieces
+from aow.game.aow import ArtOfWar
+from aow.models.board import AoWBoard
+
+
+class VecArtOfWar:
+    def __init__(self, num_envs: int, max_steps: int = 128, engine: str = Engines.OBJECT,
+                 render_mode: str = "rgb_array"):
+        """
+        Initialize N Art of War games that are stepped together. The boards of all games live in one batched array,
+        every game works on a view into it, so the observations are read without copying the games one by one
+        :param num_envs: int: The number of games
+        :param max_steps: int: The maximum number of steps of a game
+        :param engine: str: The move generation engine of the games
+        :param render_mode: str: The render mode of the games
+        """
+        self.num_envs = num_envs
+        self.boards = np.zeros((num_envs, 2, 8, 8), dtype=np.uint8)
+        self.moved = np.zeros((num_envs, 2, 8, 8), dtype=bool)
+        # The last position of every game that finished, kept since the game itself is reset by step
+        self.final_boards = np.zeros_like(self.boards)
+        self.envs = [
+            ArtOfWar(max_steps=max_steps, render_mode=render_mode, engine=engine,
+                     aow_board=AoWBoard(board=self.boards[index], moved=self.moved[index]))
+            for index in range(num_envs)
+        ]
+
+        cards_count = len(AoWBoard.init_cards()[0])
+        self.turns = np.zeros(num_envs, dtype=np.int8)
+        self.steps = np.zeros(num_envs, dtype=np.int32)
+        self.resources = np.zeros((num_envs, 2), dtype=np.int32)
+        self.played = np.zeros((num_envs, 2, cards_count), dtype=bool)
+
+    def reset(self, **kwargs) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Reset all games
+        :param kwargs: dict: The arguments to reset the games
+        :return: tuple[np.ndarray, np.ndarray]: The states and actions masks of the players to move
+        """
+        for index, env in enumerate(self.envs):
+            env.reset(**kwargs)
+            self.update_arrays(index)
+        return self.get_states(), self.get_masks()
+
+    def step(
+            self, actions: np.ndarray, active: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, list[list[set]]]:
+        """
+        Take one action in every game. A finished game is reset right away, so the returned state of that game is the
+        first state of its next game, the rewards, done and infos still belong to the finished game and its last position
+        is in final_boards
+        :param actions: np.ndarray: The action of the player to move in every game, shape (N,)
+        :param active: np.ndarray | None: The games to step, shape (N,), the others keep their position and get no
+        rewards. All games when None
+        :return: tuple: The states (N, 128) and actions masks (N, action space) of the players to move, the rewards of
+        both players (N, 2), if the games finished (N,) and the infos of both players of every game
+        """
+        rewards = np.zeros((self.num_envs, 2), dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos = [[set(), set()] for _ in range(self.num_envs)]
+
+        for index in range(self.num_envs) if active is None else np.flatnonzero(active):
+            env = self.envs[index]
+            rewards[index], dones[index], infos[index] = env.step(int(actions[index]))
+            if dones[index]:
+                self.final_boards[index] = self.boards[index]
+                env.reset()
+            self.update_arrays(index)
+
+        return self.get_states(), self.get_masks(), rewards, dones, infos
+
+    def update_arrays(self, index: int) -> None:
+        """
+        Copy the turn, steps, resources and played cards of one game into the batched arrays
+        :param index: int: The index of the game
+        """
+        env = self.envs[index]
+        self.turns[index] = env.aow_logic.turn
+        self.steps[index] = env.aow_logic.steps
+        self.resources[index] = env.aow_board.resources
+        self.played[index] = [[card.is_played() for card in cards] for cards in env.aow_board.cards]
+
+    def get_states(self) -> np.ndarray:
+        """
+        Get the states of the players to move, the same as AoWBoard.get_state for every game
+        :return: np.ndarray: The states, shape (N, 128)
+        """
+        # The player's own side comes first, so white gets the sides swapped
+        black = (self.turns == Pieces.BLACK)[:, None, None, None]
+        return np.where(black, self.boards, self.boards[:, ::-1]).reshape(self.num_envs, -1)
+
+    def get_actions(self) -> list[tuple]:
+        """
+        Get the actions of the players to move, the same as ArtOfWar.observe for every game
+        :return: list[tuple]: The source positions, next positions and actions mask of every game
+        """
+        return [env.observe()[1] for env in self.envs]
+
+    def get_masks(self) -> np.ndarray:
+        """
+        Get the actions masks of the players to move
+        :return: np.ndarray: The actions masks, shape (N, action space)
+        """
+        return np.stack([mask for _, _, mask in self.get_actions()])
+
+    def get_env(self, index: int) -> ArtOfWar:
+        """
+        Get one of the games, e.g. to render it
+        :param index: int: The index of the game
+        :return: ArtOfWar: The game
+        """
+        return self.envs[index]
+
+    def __len__(self) -> int:
+        return self.num_envs
@@ -1,3 +1,5 @@
+import itertools
+
 import numpy as np
 
 import aow.pieces as Pieces
@@ -5,30 +7,170 @@ from aow.game.check import Check
 from aow.models import Cell
 from aow.models.cards import DutchWaterline, WingedKnightUpgradeCard, HopliteUpgradeCard, WarElephantUpgradeCard
 from aow.models.cards.card import Card
+from aow.models.move_record import MoveRecord
 from aow.models.pieces import *
 from aow.utils.cell import CellUtils
+from aow.utils.zobrist import Zobrist
+
+# Shared by all boards, so a version is never handed out twice, not even after a reset
+VERSIONS = itertools.count()
+
+# The shared piece of every piece number
+PIECES = (Empty(), Pawn(), Bishop(), Knight(), Rook(), Queen(), King(), Wingedknight(), Hoplite(), Warelephant())
 
 
 class AoWBoard:
-    def __init__(self, length: int = 8, width: int = 8):
+    def __init__(self, length: int = 8, width: int = 8, board: np.ndarray | None = None,
+                 moved: np.ndarray | None = None):
         """
         Initialize the Art of War board
-        """
-        self.board: np.ndarray = self.init_board()
+        @param board: np.ndarray | None: The array to keep the board in, e.g. a view into the boards of VecArtOfWar
+        @param moved: np.ndarray | None: The array to keep the moved flags in
+        """
+        self.board: np.ndarray = self.init_board() if board is None else board
+        self.moved: np.ndarray = self.init_moved() if moved is None else moved
+        if board is not None:
+            self.board[:] = self.init_board()
+        if moved is not None:
+            self.moved[:] = False
         self.pieces: list[dict] = self.init_pieces()
         self.resources: list[int] = self.init_resources()
         self.cards: list[list[Card]] = self.init_cards()
+        self.slot_names: list[list[str]] = [[], []]
+        self.slots: list[np.ndarray] = [np.empty((0, 3), dtype=np.int8)] * 2
+        self.squares: np.ndarray = np.full((2, 8, 8), -1, dtype=np.int8)
+        self.build_index()
+        self.kings: list[Cell | None] = [None, None]
         self.length: int = length
         self.width: int = width
+        self.version: int = next(VERSIONS)
+        self.hash: int = Zobrist.hash_board(self.board, self.moved)
 
     def reset(self):
         """
         Reset the Art of War board
         """
-        self.board = self.init_board()
+        # Written in place, so views into the board stay valid
+        self.board[:] = self.init_board()
+        self.moved[:] = False
         self.pieces = self.init_pieces()
         self.resources = self.init_resources()
         self.cards = self.init_cards()
+        self.build_index()
+        self.kings = [None, None]
+        self.update_version()
+        self.hash = Zobrist.hash_board(self.board, self.moved)
+
+    def build_index(self) -> None:
+        """
+        Build the slots of the pieces and the index from the cells of the board to the slots. The slots of a player
+        are in the order of the pieces dict, every slot holds the piece number of its name and its position,
+        (-1, -1) when it was captured
+        """
+        self.squares.fill(-1)
+        for turn in range(2):
+            self.slot_names[turn] = list(self.pieces[turn].keys())
+            self.slots[turn] = np.full((len(self.slot_names[turn]), 3), -1, dtype=np.int8)
+            for slot, (name, pos) in enumerate(self.pieces[turn].items()):
+                self.slots[turn][slot, 0] = Pieces.get_piece_number(name.split("_")[0])
+                if pos is not None:
+                    self.slots[turn][slot, 1:] = pos
+                    self.squares[turn, pos[0], pos[1]] = slot
+
+    def get_slot(self, turn: int, pos: Cell) -> int:
+        """
+        Get the slot of the piece on a cell
+        @param turn: int: The player (Can be 0 or 1)
+        @param pos: Cell: The position of the piece (row, col)
+        @return: int: The slot of the piece, -1 if there is no named piece on the cell
+        """
+        return int(self.squares[turn, pos[0], pos[1]])
+
+    def get_slot_name(self, turn: int, slot: int) -> str:
+        """
+        Get the name of the piece in a slot
+        @param turn: int: The player (Can be 0 or 1)
+        @param slot: int: The slot of the piece
+        @return: str: The name of the piece, e.g. pawn_1
+        """
+        return self.slot_names[turn][slot]
+
+    def get_piece_name(self, turn: int, pos: Cell) -> str | None:
+        """
+        Get the name of the piece on a cell
+        @param turn: int: The player (Can be 0 or 1)
+        @param pos: Cell: The position of the piece (row, col)
+        @return: str | None: The name of the piece, e.g. pawn_1, or None if there is no named piece on the cell
+        """
+        slot = self.get_slot(turn, pos)
+        return None if slot < 0 else self.slot_names[turn][slot]
+
+    def set_slot_position(self, turn: int, slot: int, pos: tuple | None) -> None:
+        """
+        Set the position of the piece in a slot, this keeps the slots, the index and the pieces dict in sync
+        @param turn: int: The player (Can be 0 or 1)
+        @param slot: int: The slot of the piece
+        @param pos: tuple | None: The new position of the piece, None when it is captured
+        """
+        row, col = self.slots[turn][slot, 1:]
+        if row >= 0 and self.squares[turn, row, col] == slot:
+            self.squares[turn, row, col] = -1
+
+        if pos is None:
+            self.slots[turn][slot, 1:] = -1
+        else:
+            pos = (int(pos[0]), int(pos[1]))
+            self.slots[turn][slot, 1:] = pos
+            self.squares[turn, pos[0], pos[1]] = slot
+        self.pieces[turn][self.slot_names[turn][slot]] = pos
+
+    def move_slot(self, record: MoveRecord, turn: int, slot: int, pos: tuple | None) -> None:
+        """
+        Set the position of the piece in a slot and save its old position in the undo record
+        @param record: MoveRecord: The undo record of the move
+        @param turn: int: The player (Can be 0 or 1)
+        @param slot: int: The slot of the piece
+        @param pos: tuple | None: The new position of the piece, None when it is captured
+        """
+        record.add_slot(turn, slot, self.pieces[turn][self.slot_names[turn][slot]])
+        self.set_slot_position(turn, slot, pos)
+
+    def rename_piece(self, turn: int, name: str, new_name: str) -> None:
+        """
+        Rename a piece, e.g. when it is upgraded. The renamed piece moves to the end of the pieces dict
+        @param turn: int: The player (Can be 0 or 1)
+        @param name: str: The name of the piece
+        @param new_name: str: The new name of the piece
+        """
+        self.pieces[turn][new_name] = self.pieces[turn].pop(name)
+        self.build_index()
+
+    def get_version(self) -> int:
+        """
+        Get the version of the Art of War board. It changes with every change of the cells, pieces or cards,
+        so two equal versions mean the same position. Resources are not part of the version
+        @return: int: The version of the board
+        """
+        return self.version
+
+    def get_hash(self) -> int:
+        """
+        Get the Zobrist hash of the Art of War board. It covers both board planes, the moved flags of kings and
+        rooks, the resources and the played cards, but not the side to move, see AoWLogic.get_hash
+        @return: int: The 64-bit hash of the board
+        """
+        key = self.hash
+        for turn in range(2):
+            key ^= Zobrist.get_resources_key(turn, self.resources[turn])
+            for index, card in enumerate(self.cards[turn]):
+                key ^= Zobrist.get_card_key(turn, index, card.is_played())
+        return key
+
+    def update_version(self) -> None:
+        """
+        Give the Art of War board a new version, call this after changing the board from the outside
+        """
+        self.version = next(VERSIONS)
 
     def is_in_range(self, pos: Cell) -> bool:
         """
@@ -89,8 +231,8 @@ class AoWBoard:
         if pos.__class__ is not Cell:
             pos = Cell(pos[0], pos[1])
         if piece is None:
-            return not isinstance(self.board[turn, pos.row, pos.col], Empty)
-        return isinstance(self.board[turn, pos.row, pos.col], piece.__class__)
+            return self.board[turn, pos.row, pos.col] != Pieces.EMPTY
+        return self.board[turn, pos.row, pos.col] == piece.get_piece_number()
 
     def get_piece(self, pos: Cell, turn: int = None) -> Piece:
         """
@@ -103,25 +245,200 @@ class AoWBoard:
 
         if turn is None:
             for i in range(2):
-                if not isinstance(self.board[i, pos.row, pos.col], Empty):
-                    return self.board[i, pos.row, pos.col]
+                if self.board[i, pos.row, pos.col] != Pieces.EMPTY:
+                    return self.get_piece(pos, i)
             return Empty()
-        return self.board[turn, pos.row, pos.col]
 
-    def set_piece(self, turn: int, pos: Cell, piece: Piece) -> None:
+        return PIECES[self.board[turn, pos.row, pos.col]]
+
+    def set_piece(self, turn: int, pos: Cell, piece: Piece, has_moved: bool = False) -> None:
         """
         Set the piece of the Art of War board
         @param turn: int: The player (Can be 0 or 1)
         @param pos: Cell: The position to set the piece (row, col)
         @param piece: Pieces: The piece to set
+        @param has_moved: bool: If the piece has moved
         """
         pos = CellUtils.make_cell(pos)
-        self.board[turn, pos.row, pos.col] = piece
+        slot = self.squares[turn, pos.row, pos.col]
+        if slot >= 0 and piece.get_piece_number() == Pieces.EMPTY:
+            # The named piece on the cell is removed, e.g. by the Dutch Waterline
+            self.set_slot_position(turn, slot, None)
+        self.set_cell(turn, pos, piece.get_piece_number(), has_moved)
+
+    def set_cell(self, turn: int, pos: Cell, piece_number: int, has_moved: bool) -> None:
+        """
+        Set the piece number and moved flag of a cell, every change of the board goes through here
+        @param turn: int: The player (Can be 0 or 1)
+        @param pos: Cell: The position of the cell (row, col)
+        @param piece_number: int: The piece number to set
+        @param has_moved: bool: If the piece in the cell has moved
+        """
+        self.hash ^= Zobrist.get_cell_key(turn, pos.row, pos.col, int(self.board[turn, pos.row, pos.col]),
+                                          bool(self.moved[turn, pos.row, pos.col]))
+        self.hash ^= Zobrist.get_cell_key(turn, pos.row, pos.col, piece_number, has_moved)
+        self.board[turn, pos.row, pos.col] = piece_number
+        self.moved[turn, pos.row, pos.col] = has_moved
+        self.version = next(VERSIONS)
+
+        if piece_number == Pieces.KING:
+            self.kings[turn] = pos
+        elif pos == self.kings[turn]:
+            self.kings[turn] = None
+
+    def save_cell(self, record: MoveRecord, turn: int, pos: Cell) -> None:
+        """
+        Save a cell in the undo record before it is changed
+        @param record: MoveRecord: The undo record of the move
+        @param turn: int: The player (Can be 0 or 1)
+        @param pos: Cell: The position of the cell (row, col)
+        """
+        record.add_cell(turn, pos, int(self.board[turn, pos.row, pos.col]), bool(self.moved[turn, pos.row, pos.col]))
+
+    def clear_cell(self, record: MoveRecord, turn: int, pos: Cell) -> None:
+        """
+        Remove the piece from a cell and save the cell in the undo record
+        @param record: MoveRecord: The undo record of the move
+        @param turn: int: The player (Can be 0 or 1)
+        @param pos: Cell: The position of the cell (row, col)
+        """
+        self.save_cell(record, turn, pos)
+        self.set_cell(turn, pos, Pieces.EMPTY, False)
+
+        slot = self.squares[turn, pos.row, pos.col]
+        if slot >= 0:
+            self.move_slot(record, turn, slot, None)
+
+    def make_move(self, turn: int, current_pos: Cell, next_pos: Cell) -> MoveRecord:
+        """
+        Move a piece in place, including captures, the pawn captures of a warelephant and castling.
+        The returned record holds everything that changed so unmake_move can take the move back
+        @param turn: int: The player (Can be 0 or 1)
+        @param current_pos: Cell: The current position of the piece
+        @param next_pos: Cell: The next position of the piece
+        @return: MoveRecord: The undo record of the move
+        """
+        current_pos, next_pos = CellUtils.make_cell(current_pos), CellUtils.make_cell(next_pos)
+        record = MoveRecord(turn, current_pos, next_pos, self.version, self.resources.copy(),
+                            [[card.is_played() for card in cards] for cards in self.cards])
+
+        enemy_pos = Cell(7 - next_pos.row, next_pos.col)
+        if self.board[1 - turn, enemy_pos.row, enemy_pos.col] == Pieces.KING:
+            record.set_blocked()
+            return record
+
+        slot = self.get_slot(turn, current_pos)
+        enemy_slot = self.get_slot(1 - turn, enemy_pos)
+        if enemy_slot >= 0:
+            record.add_captured(self.slot_names[1 - turn][enemy_slot], PIECES[self.slots[1 - turn][enemy_slot, 0]])
+
+        piece_number = int(self.board[turn, current_pos.row, current_pos.col])
+        self.clear_cell(record, turn, current_pos)
+        self.save_cell(record, turn, next_pos)
+        self.set_cell(turn, next_pos, piece_number, True)
+        if slot >= 0:
+            self.move_slot(record, turn, slot, next_pos)
+        self.clear_cell(record, 1 - turn, enemy_pos)
+
+        self.capture_pawns_by_warelephant(record, turn, current_pos, next_pos)
+        self.castle(record, turn, current_pos, next_pos)
+        return record
+
+    def unmake_move(self, record: MoveRecord) -> None:
+        """
+        Take back a move made with make_move, moves have to be taken back in the reverse order they were made
+        @param record: MoveRecord: The undo record of the move
+        """
+        for turn, pos, piece_number, has_moved in reversed(record.get_cells()):
+            self.set_cell(turn, pos, piece_number, has_moved)
+
+        for turn, slot, pos in reversed(record.get_slots()):
+            self.set_slot_position(turn, slot, pos)
+
+        self.resources[:] = record.resources
+        for cards, played in zip(self.cards, record.played):
+            for card, is_played in zip(cards, played):
+                card.set_played(is_played)
+
+        # The position is the same as before the move again, so the version is too
+        self.version = record.version
+
+    def capture_pawns_by_warelephant(self, record: MoveRecord, turn: int, current_pos: Cell, next_pos: Cell) -> None:
+        """
+        Capture the enemy pawns a warelephant walked over, these captures give no reward
+        @param record: MoveRecord: The undo record of the move
+        @param turn: int: The player (Can be 0 or 1)
+        @param current_pos: Cell: The position the warelephant moved from
+        @param next_pos: Cell: The position the warelephant moved to
+        """
+        if self.board[turn, next_pos.row, next_pos.col] != Pieces.WARELEPHANT:
+            return
+
+        min_row, max_row = min(current_pos.row, next_pos.row), max(current_pos.row, next_pos.row)
+        min_col, max_col = min(current_pos.col, next_pos.col), max(current_pos.col, next_pos.col)
+
+        for r in range(min_row + 1, max_row):
+            if self.board[1 - turn, 7 - r, current_pos.col] == Pieces.PAWN:
+                self.clear_cell(record, 1 - turn, Cell(7 - r, current_pos.col))
+
+        for c in range(min_col + 1, max_col):
+            if self.board[1 - turn, 7 - current_pos.row, c] == Pieces.PAWN:
+                self.clear_cell(record, 1 - turn, Cell(7 - current_pos.row, c))
+
+    def castle(self, record: MoveRecord, turn: int, current_pos: Cell, next_pos: Cell) -> None:
+        """
+        Move the rook next to the king when the king castled. Only a king moving two columns from (0, 4) with a rook on
+        the corner castles, the legality checks also try these moves with a king somewhere else
+        @param record: MoveRecord: The undo record of the move
+        @param turn: int: The player (Can be 0 or 1)
+        @param current_pos: Cell: The position the king moved from
+        @param next_pos: Cell: The position the king moved to
+        """
+        if self.board[turn, next_pos.row, next_pos.col] != Pieces.KING or current_pos != Cell(0, 4):
+            return
+
+        if next_pos == Cell(0, 2):
+            rook_pos, castled_pos = Cell(0, 0), Cell(0, 3)
+        elif next_pos == Cell(0, 6):
+            rook_pos, castled_pos = Cell(0, 7), Cell(0, 5)
+        else:
+            return
+
+        if self.board[turn, rook_pos.row, rook_pos.col] != Pieces.ROOK:
+            return
+
+        has_moved = bool(self.moved[turn, rook_pos.row, rook_pos.col])
+        slot = self.get_slot(turn, rook_pos)
+        # Cleared like every other cell, so a piece in the way keeps its slot after unmake_move
+        self.clear_cell(record, turn, castled_pos)
+        self.set_cell(turn, castled_pos, Pieces.ROOK, has_moved)
+        self.clear_cell(record, turn, rook_pos)
+        if slot >= 0:
+            self.move_slot(record, turn, slot, castled_pos)
+
+    def has_moved(self, turn: int, pos: Cell) -> bool:
+        """
+        Check if the piece in the cell has moved
+        @param turn: int: The player (Can be 0 or 1)
+        @param pos: Cell: The position of the piece (row, col)
+        @return: bool: If the piece has moved
+        """
+        return bool(self.moved[turn, pos[0], pos[1]])
+
+    def set_has_moved(self, turn: int, pos: Cell, has_moved: bool = True) -> None:
+        """
+        Set if the piece in the cell has moved
+        @param turn: int: The player (Can be 0 or 1)
+        @param pos: Cell: The position of the piece (row, col)
+        @param has_moved: bool: If the piece has moved
+        """
+        pos = CellUtils.make_cell(pos)
+        self.set_cell(turn, pos, int(self.board[turn, pos.row, pos.col]), has_moved)
 
     def get_board(self) -> np.ndarray:
         """
-        Get the Art of War board
-        @return: np.ndarray: The Art of War board
+        Get the Art of War board, this is the board itself and not a copy so it should not be modified
+        @return: np.ndarray: The Art of War board with the piece number of every cell
         """
         return self.board
 
@@ -139,16 +456,23 @@ class AoWBoard:
         Initialize the Art of War board
         @return: np.ndarray: The Art of War board
         """
-        board = np.zeros((2, 8, 8), dtype=Piece)
-        board[:, :, :] = Empty()
-        board[:, 0, 3] = Queen()
-        board[:, 0, 4] = King()
-        board[:, 1, :] = Pawn()
-        board[:, 0, (0, 7)] = Rook()
-        board[:, 0, (1, 6)] = Knight()
-        board[:, 0, (2, 5)] = Bishop()
+        board = np.full((2, 8, 8), Pieces.EMPTY, dtype=np.uint8)
+        board[:, 0, 3] = Pieces.QUEEN
+        board[:, 0, 4] = Pieces.KING
+        board[:, 1, :] = Pieces.PAWN
+        board[:, 0, (0, 7)] = Pieces.ROOK
+        board[:, 0, (1, 6)] = Pieces.KNIGHT
+        board[:, 0, (2, 5)] = Pieces.BISHOP
         return board
 
+    @staticmethod
+    def init_moved() -> np.ndarray:
+        """
+        Initialize the moved flags of the Art of War board
+        @return: np.ndarray: For every cell of the board if the piece in it has moved
+        """
+        return np.zeros((2, 8, 8), dtype=bool)
+
     @staticmethod
     def init_pieces() -> list[dict]:
         """
@@ -178,22 +502,16 @@ class AoWBoard:
         @param turn: int: The player (Can be 0 or 1)
         @return: np.ndarray: The state of the player
         """
-        arr = self.get_numeric_board()
-        if turn == Pieces.WHITE:
-            arr[[0, 1]] = arr[[1, 0]]
-        return arr.flatten()
+        # The player's own side comes first, so white gets the sides swapped
+        board = self.board if turn == Pieces.BLACK else self.board[::-1]
+        return board.flatten()
 
     def get_numeric_board(self) -> np.ndarray:
         """
         Get the numeric board of the Art of War board
-        @return: np.ndarray: The numeric board of the Art of War board
+        @return: np.ndarray: A copy of the numeric board of the Art of War board
         """
-        numeric_board = np.zeros((2, 8, 8), dtype=int)
-        for i in range(2):
-            for j in range(8):
-                for k in range(8):
-                    numeric_board[i, j, k] = self.board[i, j, k].__str__()
-        return numeric_board
+        return self.board.copy()
 
     def get_pieces_names(self) -> tuple:
         """
@@ -211,12 +529,14 @@ class AoWBoard:
         """
         # TODO: Fix this, when entering a board not with all pieces,
         #  the action mask will be different resulting in a confused AI
-        for i in range(2):
-            for j in range(8):
-                for k in range(8):
-                    self.board[i, j, k] = self.get_piece_from_number(board[i, j, k])
+        self.board[:] = board
+        self.moved[:] = False
         self.pieces = self.get_pieces_from_board(board)
         self.pieces_names = self.get_pieces_names()
+        self.build_index()
+        self.kings = [None, None]
+        self.update_version()
+        self.hash = Zobrist.hash_board(self.board, self.moved)
 
     def get_piece_from_number(self, number: int) -> Piece:
         """
@@ -224,18 +544,7 @@ class AoWBoard:
         @param number: int: The number of the piece
         @return: Pieces: The piece of the Art of War board
         """
-        return {  # TODO: Fix this
-            0: Empty(),
-            1: Pawn(),
-            2: Bishop(),
-            3: Knight(),
-            4: Rook(),
-            5: Queen(),
-            6: King(),
-            7: Wingedknight(),
-            8: Hoplite(),
-            9: Warelephant(),
-        }[number]
+        return PIECES[number]
 
     def get_pieces_from_board(self, board: np.array) -> list[dict]:
         """
@@ -277,12 +586,17 @@ class AoWBoard:
         @param turn: int: The player (Can be 0 or 1)
         @return: Cell: The position of the king
         """
-        for i in range(8):
-            for j in range(8):
-                if self.is_piece(turn, Cell(i, j), King()):
-                    return Cell(i, j)
-        print(self.get_numeric_board())
-        assert False, f"King not found for {turn}"
+        # The king is tracked by set_cell, the board is only searched after a reset or set_board
+        if self.kings[turn] is not None:
+            return self.kings[turn]
+
+        kings = np.argwhere(self.board[turn] == Pieces.KING)
+        if len(kings) == 0:
+            print(self.get_numeric_board())
+            assert False, f"King not found for {turn}"
+
+        self.kings[turn] = Cell(int(kings[0][0]), int(kings[0][1]))
+        return self.kings[turn]
 
     def is_enemy_piece(self, pos: Cell, turn: int) -> bool:
         """
@@ -394,12 +708,10 @@ class AoWBoard:
         @param turn: int: The player (Can be 0 or 1)
         @return: bool: If the move leads to a check
         """
-        # Added import here, otherwise you will get circular imports
-        from aow.game.aow import ArtOfWar
-        temp = ArtOfWar(1, render_mode="rgb_array")
-        temp.aow_board.board = self.copy_board()
-        temp.aow_logic.move_piece(current_pos, next_pos, turn)
-        return Check(temp.aow_board).is_check(temp.aow_board.get_king_position(turn), turn)
+        record = self.make_move(turn, current_pos, next_pos)
+        is_check = Check(self).is_check(self.get_king_position(turn), turn)
+        self.unmake_move(record)
+        return is_check
 
     def is_path_empty_for_piece(self, current_pos: Cell, next_pos: Cell, turn: int) -> bool:
         """
@@ -409,16 +721,8 @@ class AoWBoard:
         @param turn: int: The player (Can be 0 or 1)
         @return: bool: If the path is empty for the piece
         """
-        # TODO: This could be improved
         piece = self.get_piece(current_pos, turn)
-        this_piece = None
-        for dic in self.pieces:
-            for key, val in dic.items():
-                if val == current_pos:
-                    this_piece = key.split("_")[0]
-
-        # ! Especially this one
-        if this_piece == "warelephant":
+        if piece.get_piece_number() == Pieces.WARELEPHANT:
             return self.is_path_empty(current_pos, next_pos, turn, except_pawn=True)
         else:
             return piece.can_jump() or (self.is_path_empty(current_pos, next_pos, turn))
@@ -10,8 +10,8 @@ class UpgradeCard(Card):
         self.piece_to_upgrade = piece_to_upgrade
 
     def get_empty_upgrade_actions(self, turn: int, board: 'AoWBoard'):
-        pieces = [key for key in board.pieces[turn].keys() if
-                  key.split("_")[0] == self.piece_to_upgrade.get_name().lower()]
+        slots = np.nonzero(board.slots[turn][:, 0] == self.piece_to_upgrade.get_piece_number())[0]
+        pieces = [board.get_slot_name(turn, slot) for slot in slots]
 
         possibles = np.zeros((len(pieces), 2), dtype=np.int32)
         actions_mask = np.zeros(len(pieces), dtype=np.int32)
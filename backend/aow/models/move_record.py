@@ -0,0 +1,88 @@
+from aow.models.pieces.piece import Piece
+from aow.models.types import Cell
+
+
+class MoveRecord:
+    def __init__(self, turn: int, current_pos: Cell, next_pos: Cell, version: int, resources: list[int],
+                 played: list[list[bool]]):
+        """
+        Initialize the undo record of a move made on the Art of War board
+        @param turn: int: The player who made the move (Can be 0 or 1)
+        @param current_pos: Cell: The position the piece moved from
+        @param next_pos: Cell: The position the piece moved to
+        @param version: int: The version of the board before the move
+        @param resources: list[int]: The resources of both players before the move
+        @param played: list[list[bool]]: For both players if their cards were played before the move
+        """
+        self.turn = turn
+        self.current_pos = current_pos
+        self.next_pos = next_pos
+        self.version = version
+        self.resources = resources
+        self.played = played
+        self.cells: list[tuple[int, Cell, int, bool]] = []
+        self.slots: list[tuple[int, int, tuple | None]] = []
+        self.captured: list[tuple[str, Piece]] = []
+        self.blocked = False
+
+    def add_cell(self, turn: int, pos: Cell, piece_number: int, has_moved: bool) -> None:
+        """
+        Save a cell of the board before the move changes it
+        @param turn: int: The side of the board (Can be 0 or 1)
+        @param pos: Cell: The position of the cell
+        @param piece_number: int: The piece number in the cell before the move
+        @param has_moved: bool: If the piece in the cell had moved before the move
+        """
+        self.cells.append((turn, pos, piece_number, has_moved))
+
+    def get_cells(self) -> list[tuple[int, Cell, int, bool]]:
+        """
+        Get the saved cells of the board in the order they were changed
+        @return: list[tuple[int, Cell, int, bool]]: The side, position, piece number and moved flag of every cell
+        """
+        return self.cells
+
+    def add_slot(self, turn: int, slot: int, pos: tuple | None) -> None:
+        """
+        Save the position of the piece in a slot before the move changes it
+        @param turn: int: The player of the piece (Can be 0 or 1)
+        @param slot: int: The slot of the piece
+        @param pos: tuple | None: The position of the piece before the move
+        """
+        self.slots.append((turn, slot, pos))
+
+    def get_slots(self) -> list[tuple[int, int, tuple | None]]:
+        """
+        Get the saved positions of the slots in the order they were changed
+        @return: list[tuple[int, int, tuple | None]]: The player, slot and position of every piece
+        """
+        return self.slots
+
+    def add_captured(self, name: str, piece: Piece) -> None:
+        """
+        Add a piece of the enemy that was captured by the move
+        @param name: str: The name of the captured piece, e.g. pawn_1
+        @param piece: Piece: The type of the captured piece
+        """
+        self.captured.append((name, piece))
+
+    def get_captured(self) -> list[tuple[str, Piece]]:
+        """
+        Get the enemy pieces captured by the move
+        @return: list[tuple[str, Piece]]: The name and type of every captured piece
+        """
+        return self.captured
+
+    def is_blocked(self) -> bool:
+        """
+        Check if the move was not made because the enemy king is on the next position
+        @return: bool: If the move was blocked
+        """
+        return self.blocked
+
+    def set_blocked(self, blocked: bool = True) -> None:
+        """
+        Set if the move was not made because the enemy king is on the next position
+        @param blocked: bool: If the move was blocked
+        """
+        self.blocked = blocked
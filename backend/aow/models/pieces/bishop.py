@@ -1,10 +1,12 @@
 from aow.models.pieces.piece import Piece
-from aow.models.types import Cell
 import aow.constants.moves as Moves
+import aow.constants.rewards as Rewards
 
 class Bishop(Piece):
-    def __init__(self, position: Cell | None = None):
-        super().__init__(position=position, piece_number=2, possibles_length=7*4)
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(piece_number=2, possibles_length=7*4, reward=Rewards.BISHOP)
 
     def get_moves(self) -> tuple:
         return Moves.BISHOP
@@ -1,13 +1,16 @@
 import aow.constants.moves as Moves
+import aow.constants.rewards as Rewards
 from aow.models.pieces.piece import Piece
 from aow.models.pieces.queen import Queen
 from aow.models.types import Cell
 
 
 class Hoplite(Piece):
-    def __init__(self, position: Cell | None = None):
-        super().__init__(position=position, piece_number=8, possibles_length=7 * 4 * 2, upgradable=True,
-                         upgrade_options=[Queen()])
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(piece_number=8, possibles_length=7 * 4 * 2, upgradable=True,
+                         upgrade_options=(Queen(),), reward=Rewards.HOPLITE)
 
     def get_moves(self) -> tuple:
         return Moves.HOPLITE
@@ -15,11 +18,8 @@ class Hoplite(Piece):
     def get_actions(self, board: 'AoWBoard', pos: Cell | None, turn: int, deny_enemy_king: bool = False) -> tuple:
         possibles, actions_mask = self.get_empty_actions()
 
-        if pos is None and self.position is None:
-            return possibles, actions_mask
-
         if pos is None:
-            pos = self.position
+            return possibles, actions_mask
 
         # add 1 to front move
         if board.is_valid_move(pos, Cell(pos[0] + 1, pos[1]), turn, deny_enemy_king):
@@ -1,4 +1,5 @@
 import aow.constants.moves as Moves
+import aow.constants.rewards as Rewards
 from aow.game.check import Check
 from aow.models.pieces.piece import Piece
 from aow.models.pieces.rook import Rook
@@ -7,8 +8,10 @@ from aow.utils.cell import CellUtils
 
 
 class King(Piece):
-    def __init__(self, position: Cell | None = None):
-        super().__init__(position=position, piece_number=6, possibles_length=10)
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(piece_number=6, possibles_length=10, reward=Rewards.KING)
 
     def get_moves(self) -> tuple:
         return Moves.KING
@@ -52,7 +55,7 @@ class King(Piece):
         if Check(board).is_check(king_pos, turn):
             return False
 
-        if self.has_moved() or (king_pos.row != 0 and king_pos.col != 4):
+        if board.has_moved(turn, king_pos) or (king_pos.row != 0 and king_pos.col != 4):
             return False
 
         if not board.is_path_empty(king_pos, rook_pos, turn):
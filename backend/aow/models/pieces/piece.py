@@ -3,27 +3,46 @@ import numpy as np
 from aow.models.types import Cell
 
 
-class Piece:
-    def __init__(self, possibles_length: int, position: Cell | None = None, piece_number: int = -1,
-                 can_jump: bool = False, upgradable: bool = False, upgrade_options: list['Piece'] = None):
+class PieceType(type):
+    """
+    Metaclass of the pieces, every piece type has one shared instance and calling the class returns it
+    """
+    instances: dict = {}
+
+    def __call__(cls) -> 'Piece':
+        if cls not in PieceType.instances:
+            PieceType.instances[cls] = super().__call__()
+        return PieceType.instances[cls]
+
+
+class Piece(metaclass=PieceType):
+    __slots__ = ("possibles_length", "jump", "piece_number", "upgradable", "upgrade_options", "reward")
+
+    def __init__(self, possibles_length: int, piece_number: int = -1, can_jump: bool = False,
+                 upgradable: bool = False, upgrade_options: tuple['Piece', ...] = (), reward: int = 0):
         """
-        Initialize the Piece class
-        @param color: Colors: The color of the piece
-        @param position: Cell: The position of the piece
+        Initialize the Piece class, a piece only describes its type and is shared by every cell that holds it.
+        Where a piece is and if it has moved is kept by the board
         @param possibles_length: int: The length of the possible moves array
+        @param piece_number: int: The number of the piece on the board
         @param can_jump: bool: If the piece can jump over other pieces
+        @param upgradable: bool: If the piece can be upgraded
+        @param upgrade_options: tuple[Piece, ...]: The pieces this piece can be upgraded to
+        @param reward: int: The reward for capturing the piece
         """
-        if upgrade_options is None:
-            upgrade_options = []
+        object.__setattr__(self, "possibles_length", possibles_length)
+        object.__setattr__(self, "jump", can_jump)
+        object.__setattr__(self, "piece_number", piece_number)
+        object.__setattr__(self, "upgradable", upgradable)
+        object.__setattr__(self, "upgrade_options", tuple(upgrade_options))
+        object.__setattr__(self, "reward", reward)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"{self.get_name()} is shared by the whole board and can not be changed")
 
-        self.position: Cell = position
-        self.possibles_length: int = possibles_length
-        self.jump: bool = can_jump
-        self.piece_number = piece_number
-        self.on_board = True
-        self.upgradable = upgradable
-        self.upgrade_options = upgrade_options
-        self.moved = False
+    def __reduce__(self) -> tuple:
+        # Copies and pickles of a piece are the shared piece again
+        return self.__class__, ()
 
     def get_piece_number(self) -> int:
         """
@@ -32,55 +51,20 @@ class Piece:
         """
         return self.piece_number
 
-    def has_moved(self) -> bool:
-        """
-        Get if the piece has moved
-        @return: bool: If the piece has moved
-        """
-        return self.moved
-
-    def is_on_board(self) -> bool:
-        """
-        Get if the piece is on the board
-        @return: bool: If the piece is on the board
-        """
-        return self.on_board
-
-    def set_is_on_board(self, is_on_board: bool) -> None:
+    def get_reward(self) -> int:
         """
-        Set if the piece is on the board
-        @param is_on_board: bool: If the piece is on the board
+        Get the reward for capturing the piece
+        @return: int: The reward for capturing the piece
         """
-        self.on_board = is_on_board
+        return self.reward
 
-    def set_has_moved(self, has_moved: bool = True) -> None:
-        """
-        Set if the piece has moved
-        @param has_moved: bool: If the piece has moved
-        """
-        self.moved = has_moved
-
-    def get_upgrade_options(self) -> list['Piece']:
+    def get_upgrade_options(self) -> tuple['Piece', ...]:
         """
         Get the upgrade options of the piece
-        @return: list: The upgrade options of the piece
+        @return: tuple: The upgrade options of the piece
         """
         return self.upgrade_options
 
-    def get_position(self) -> Cell:
-        """
-        Get the position of the piece
-        @return: Cell: The position of the piece
-        """
-        return self.position
-
-    def set_position(self, position: str) -> None:
-        """
-        Set the position of the piece
-        @param position: str: The position of the piece
-        """
-        self.position = position
-
     def get_possibles_size(self) -> int:
         """
         Get the size of the possibles array
@@ -133,11 +117,8 @@ class Piece:
         """
         possibles, actions_mask = self.get_empty_actions()
 
-        if pos is None and self.position is None or not self.is_on_board():
-            return possibles, actions_mask
-
         if pos is None:
-            pos = self.position
+            return possibles, actions_mask
 
         for i, (r, c) in enumerate(self.get_moves()):
 
@@ -39,6 +39,21 @@ def get_piece_name(piece: int) -> str:
     }[piece]
 
 
+def get_piece_number(name: str) -> int:
+    return {
+        "empty": EMPTY,
+        "pawn": PAWN,
+        "bishop": BISHOP,
+        "knight": KNIGHT,
+        "rook": ROOK,
+        "queen": QUEEN,
+        "king": KING,
+        "wingedknight": WINGED_KNIGHT,
+        "hoplite": HOPLITE,
+        "warelephant": WARELEPHANT,
+    }[name]
+
+
 def get_upgraded_variant(piece: int) -> int:
     return {
         EMPTY: EMPTY,
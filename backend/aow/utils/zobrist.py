@@ -0,0 +1,99 @@
+import numpy as np
+
+import aow.pieces as Pieces
+
+# A fixed seed keeps the keys equal between processes and runs, so hashes can be stored and compared
+SEED = 0x41_6F_57
+RNG = np.random.default_rng(SEED)
+MASK_64 = (1 << 64) - 1
+PIECES_COUNT = 10
+CARDS_COUNT = 6
+
+# Only the moved flag of these pieces changes what moves are possible (castling)
+CASTLING_PIECES = (Pieces.KING, Pieces.ROOK)
+
+
+def build_keys(*shape: int) -> list:
+    """
+    Build a nested list of random 64-bit keys
+    @param shape: int: The shape of the keys
+    @return: list: The random keys as python ints
+    """
+    return RNG.integers(0, 1 << 64, size=shape, dtype=np.uint64).tolist()
+
+
+PIECE_KEYS = build_keys(2, 8, 8, PIECES_COUNT)
+MOVED_KEYS = build_keys(2, 8, 8)
+CARD_KEYS = build_keys(2, CARDS_COUNT)
+TURN_KEY = build_keys(1)[0]
+RESOURCES_SEED = build_keys(1)[0]
+
+for side in PIECE_KEYS:
+    for row in side:
+        for keys in row:
+            keys[Pieces.EMPTY] = 0
+
+
+class Zobrist:
+    @staticmethod
+    def get_cell_key(turn: int, row: int, col: int, piece_number: int, has_moved: bool) -> int:
+        """
+        Get the key of one cell of the board
+        @param turn: int: The side of the board (Can be 0 or 1)
+        @param row: int: The row of the cell
+        @param col: int: The column of the cell
+        @param piece_number: int: The piece number in the cell
+        @param has_moved: bool: If the piece in the cell has moved
+        @return: int: The key of the cell, 0 for an empty cell
+        """
+        key = PIECE_KEYS[turn][row][col][piece_number]
+        if has_moved and piece_number in CASTLING_PIECES:
+            key ^= MOVED_KEYS[turn][row][col]
+        return key
+
+    @staticmethod
+    def get_resources_key(turn: int, resources: int) -> int:
+        """
+        Get the key of the resources of a player, the resources have no upper bound so the key is mixed from the
+        value instead of looked up (splitmix64)
+        @param turn: int: The player (Can be 0 or 1)
+        @param resources: int: The resources of the player
+        @return: int: The key of the resources
+        """
+        key = (RESOURCES_SEED + (turn << 32) + resources) & MASK_64
+        key = ((key ^ (key >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+        key = ((key ^ (key >> 27)) * 0x94D049BB133111EB) & MASK_64
+        return key ^ (key >> 31)
+
+    @staticmethod
+    def get_card_key(turn: int, index: int, played: bool) -> int:
+        """
+        Get the key of a card of a player
+        @param turn: int: The player (Can be 0 or 1)
+        @param index: int: The index of the card in the cards of the player
+        @param played: bool: If the card was played
+        @return: int: The key of the card, 0 when it was not played
+        """
+        return CARD_KEYS[turn][index] if played else 0
+
+    @staticmethod
+    def get_turn_key(turn: int) -> int:
+        """
+        Get the key of the side to move
+        @param turn: int: The player to move (Can be 0 or 1)
+        @return: int: The key of the side to move
+        """
+        return TURN_KEY if turn else 0
+
+    @staticmethod
+    def hash_board(board: np.ndarray, moved: np.ndarray) -> int:
+        """
+        Hash both planes of a board from scratch
+        @param board: np.ndarray: The piece numbers of the board, shape (2, 8, 8)
+        @param moved: np.ndarray: The moved flags of the board, shape (2, 8, 8)
+        @return: int: The hash of the board
+        """
+        key = 0
+        for turn, row, col in zip(*np.nonzero(board)):
+            key ^= Zobrist.get_cell_key(turn, row, col, int(board[turn, row, col]), bool(moved[turn, row, col]))
+        return key
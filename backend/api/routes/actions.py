@@ -25,7 +25,7 @@ class PlayableActions(BaseRoute):
             self.action_request.pieceLocation = reverse_move(f"{self.action_request.pieceLocation}a1")[:2]
 
         try:
-            src, dst, mask = self.env.aow_logic.get_all_actions(self.action_request.turn)
+            src, dst, mask = self.env.observe()[1]
             from_pos = self.convert_cell_to_position()
 
             all_playable_actions_for_piece = self.get_all_playable_actions_for_piece(src, from_pos, mask)
@@ -60,7 +60,7 @@ class AiGame(BaseRoute):
     def play_game(self, agent, episode) -> AIGameResponse:
         response = AIGameResponse(game=[], statistics=[], possibles=[], source_pos=[], action_mask=[], winner="")
 
-        response.game.append(agent.env.aow_board.get_numeric_board().tolist())
+        response.game.append(agent.env.aow_board.get_board().tolist())
         response.statistics.append({"rewards": [0, 0], "infos": [[], []], "end": False})
 
         done = False
@@ -68,7 +68,7 @@ class AiGame(BaseRoute):
         while not done:
             done, info = agent.take_action(agent.env.aow_logic.turn, episode)
             response.statistics.append({"rewards": info[1], "infos": info[7], "end": done})
-            response.game.append(agent.env.aow_board.get_numeric_board().tolist())
+            response.game.append(agent.env.aow_board.get_board().tolist())
 
         response = self.check_winner(info[7], response)
         self.logger.info("AI game completed.")
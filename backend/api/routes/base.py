@@ -5,7 +5,7 @@ from dotenv import load_dotenv
 from fastapi import HTTPException
 
 from learnings.ppo import PPO
-from utils import matches_regex
+from utils import getenv_flag, matches_regex
 
 BOARD_LENGTH = 8
 BOARD_WIDTH = 8
@@ -68,4 +68,7 @@ class BaseRoute:
             gae_lambda=float(os.getenv("PPO_GAE_LAMBDA")),
             policy_clip=float(os.getenv("PPO_POLICY_CLIP")),
             learning_rate=float(os.getenv("PPO_LEARNING_RATE")),
+            shared=getenv_flag("PPO_SHARED"),
+            masked_logits=getenv_flag("PPO_MASKED_LOGITS"),
+            factorized=getenv_flag("PPO_FACTORIZED"),
         )
@@ -16,7 +16,7 @@ class Initialize(BaseRoute):
             card_names = []
             for card in cards:
                 card_names.append(card.__str__())
-            return InitializeResponse(board=self.env.aow_board.get_numeric_board().tolist(), cards=card_names,
+            return InitializeResponse(board=self.env.aow_board.get_board().tolist(), cards=card_names,
                                       resources=self.env.aow_board.resources, pieces=self.env.aow_board.pieces)
         except FileNotFoundError as e:
             self.logger.error(f"Could not find model on specified location, make sure the location is correct. {e}")
@@ -39,7 +39,7 @@ class Move(BaseRoute):
 
         self.logger.info("Move processed successfully.")
         return MoveResponse(playerMoveBoard=player_move_board,
-                            combinedMoveBoard=self.env.aow_board.get_numeric_board().tolist(),
+                            combinedMoveBoard=self.env.aow_board.get_board().tolist(),
                             cards=card_names,
                             resources=self.env.aow_board.resources,
                             has_game_ended=self.env.aow_logic.done,
@@ -88,7 +88,7 @@ class Move(BaseRoute):
                 action_str = reverse_move(action_str)
 
             from_pos, to_pos = convert_move_to_positions(action_str)
-            src, dst, mask = self.env.aow_logic.get_all_actions(self.env.aow_logic.turn)
+            src, dst, mask = self.env.observe()[1]
             valid_src, valid_dst, valid_indices = self.get_valid_actions(src, dst, mask)
             index = np.nonzero((valid_src == from_pos).all(axis=1) & (valid_dst == to_pos).all(axis=1))[0]
             action = valid_indices[index] if len(index) > 0 else []
@@ -96,7 +96,7 @@ class Move(BaseRoute):
                 self.raise_http_exception(400, "Invalid move.")
             _, done, infos = self.env.step(int(action))
 
-            player_move_board = self.env.aow_board.get_numeric_board().tolist()
+            player_move_board = self.env.aow_board.get_board().tolist()
             return player_move_board, done, infos
         except HTTPException as e:
             raise e
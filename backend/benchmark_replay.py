@@ -0,0 +1,44 @@
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from buffer.dqn import BufferDQN
+from buffer.prioritized import BufferPrioritized
+
+# The cost of sampling a batch and updating its priorities against the number of stored transitions
+STATE_DIM = 128
+ACTION_DIM = 1200
+MAX_STEPS = 128
+BATCH_SIZE = 64
+REPEATS = 200
+
+
+def fill(buffer: BufferDQN, transitions: int) -> None:
+    # Writes the columns directly, building episodes would only measure add
+    buffer.size = transitions
+    buffer.position = transitions % buffer.capacity
+    buffer.returns[:transitions] = np.random.standard_normal(transitions)
+    if isinstance(buffer, BufferPrioritized):
+        buffer.tree.update(np.arange(transitions), np.random.random(transitions))
+
+
+def time_sample(buffer: BufferDQN) -> float:
+    start = perf_counter()
+    for _ in range(REPEATS):
+        batch = buffer.sample(BATCH_SIZE)
+        if isinstance(buffer, BufferPrioritized):
+            buffer.update_priorities(batch[-1], np.random.standard_normal(BATCH_SIZE))
+    return (perf_counter() - start) / REPEATS * 1e6
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000]
+    print(f"{'transitions':>12} {'uniform us':>12} {'prioritized us':>15}")
+    for size in sizes:
+        episodes = -(-size // MAX_STEPS)
+        uniform = BufferDQN(episodes, BATCH_SIZE, 0.99, 1, MAX_STEPS, STATE_DIM, ACTION_DIM)
+        prioritized = BufferPrioritized(episodes, BATCH_SIZE, 0.99, 1, MAX_STEPS, STATE_DIM, ACTION_DIM)
+        fill(uniform, size)
+        fill(prioritized, size)
+        print(f"{size:>12} {time_sample(uniform):>12.1f} {time_sample(prioritized):>15.1f}")
@@ -1,7 +1,5 @@
 from buffer.base import Buffer
 from buffer.episode import Episode
-import utils
-from collections import deque
 import numpy as np
 
 
@@ -11,48 +9,75 @@ class BufferDQN(Buffer):
             max_size: int,
             batch_size: int,
             gamma: float,
-            tau: float,
+            n_steps: int,
+            max_steps: int,
+            state_dim: int,
+            action_dim: int,
             shuffle: bool = True
     ) -> None:
         super().__init__(max_size, batch_size, shuffle)
         self.gamma = gamma
-        self.tau = tau
-        self.episodes = deque(maxlen=max_size)
-        self.advantages = deque(maxlen=max_size)
+        self.n_steps = n_steps
 
-    def add(self, episode: Episode):
-        self.episodes.append(episode)
-        self.advantages.append(episode.calc_advantage(self.gamma, self.tau))
+        # A ring of n-step transitions, the oldest transitions are overwritten when it is full
+        self.capacity = max_size * max_steps
+        self.position = 0
+        self.size = 0
+        self.states = np.zeros((self.capacity, state_dim), dtype=np.uint8)
+        self.actions = np.zeros(self.capacity, dtype=np.int16)
+        self.returns = np.zeros(self.capacity, dtype=np.float32)
+        self.next_states = np.zeros((self.capacity, state_dim), dtype=np.uint8)
+        self.next_masks = np.zeros((self.capacity, (action_dim + 7) // 8), dtype=np.uint8)
+        self.dones = np.zeros(self.capacity, dtype=bool)
+        self.discounts = np.zeros(self.capacity, dtype=np.float32)
+
+    def add(self, episode: Episode) -> int:
+        # The enemy's replies repeat the decision before them, their rewards are added to it, so a transition goes from
+        # one decision of the player to its next decision
+        decisions = np.logical_not(episode.replies)
+        n = int(decisions.sum())
+        if n == 0:
+            return 0
+        rewards = np.bincount(np.cumsum(decisions) - 1, weights=episode.rewards, minlength=n)
+
+        # Every step gets the discounted rewards of up to n_steps steps and the state n_steps steps later. An
+        # episode only ends after its last step, so the transitions that reach past it are terminal
+        returns = np.zeros(n)
+        for i in range(min(self.n_steps, n)):
+            returns[:n - i] += self.gamma ** i * rewards[i:]
+        steps = np.arange(n)
+        next_steps = np.minimum(steps + self.n_steps, n - 1)
+        dones = steps + self.n_steps >= n
+        states = np.asarray(episode.states)[decisions]
+        masks = np.asarray(episode.masks)[decisions]
+
+        indices = (self.position + steps) % self.capacity
+        self.states[indices] = states
+        self.actions[indices] = np.asarray(episode.actions)[decisions]
+        self.returns[indices] = returns
+        self.next_states[indices] = states[next_steps]
+        self.next_masks[indices] = masks[next_steps]
+        self.dones[indices] = dones
+        self.discounts[indices] = self.gamma ** self.n_steps
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        return n
 
     def clear(self) -> None:
-        self.episodes.clear()
-        self.advantages.clear()
+        self.position = 0
+        self.size = 0
 
     def get_len(self) -> int:
-        return len(self.episodes)
-
-    def sample(self):
-        probs = sum(map(lambda x: x.probs, self.episodes), [])
-        goals = sum(map(lambda x: x.goals, self.episodes), [])
-        masks = sum(map(lambda x: x.masks, self.episodes), [])
-        values = sum(map(lambda x: x.values, self.episodes), [])
-        states = sum(map(lambda x: x.states, self.episodes), [])
-        actions = sum(map(lambda x: x.actions, self.episodes), [])
-        rewards = sum(map(lambda x: x.rewards, self.episodes), [])
-        advantages = sum(self.advantages, [])
-
-        batches = utils.make_batch_ids(
-            n=len(states), batch_size=self.batch_size, shuffle=self.shuffle
-        )
+        return self.size
 
+    def sample(self, batch_size: int = None):
+        indices = np.random.randint(0, self.size, size=batch_size or self.batch_size)
         return (
-            np.array(states),
-            np.array(actions),
-            np.array(rewards),
-            np.array(goals),
-            np.array(probs),
-            np.array(values),
-            np.array(masks),
-            np.array(advantages),
-            batches,
+            self.states[indices],
+            self.actions[indices],
+            self.returns[indices],
+            self.next_states[indices],
+            self.next_masks[indices],
+            self.dones[indices],
+            self.discounts[indices],
         )
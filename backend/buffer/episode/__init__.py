@@ -1 +1 @@
-from .module import Episode
\ No newline at end of file
+from .module import Episode, compute_advantages
\ No newline at end of file
@@ -1,8 +1,12 @@
 import numpy as np
 
+import utils
+
 
 class Episode:
-    def __init__(self) -> None:
+    def __init__(self, policy_version: int = 0) -> None:
+        # The version of the weights the episode was played with, see SharedWeights
+        self.policy_version = policy_version
         self.goals = []
         self.probs = []
         self.masks = []
@@ -10,6 +14,8 @@ class Episode:
         self.states = []
         self.rewards = []
         self.actions = []
+        # If a step repeats the previous decision with the reward of the enemy's reply, see BaseAgent.update_enemy
+        self.replies = []
 
     def add(
         self,
@@ -20,8 +26,10 @@ class Episode:
         prob: float = None,
         value: float = None,
         masks: np.ndarray = None,
+        reply: bool = False,
     ):
         self.goals.append(goal)
+        self.replies.append(reply)
         self.states.append(state)
         self.rewards.append(reward)
         self.actions.append(action)
@@ -31,27 +39,45 @@ class Episode:
         if value is not None:
             self.values.append(value)
         if masks is not None:
-            self.masks.append(masks)
+            # Packed to one bit per action, see utils.unpack_masks
+            self.masks.append(utils.pack_mask(masks))
 
     def calc_advantage(self, gamma: float, gae_lambda: float) -> np.ndarray:
-        n = len(self.rewards)
-        advantages = np.zeros(n)
-        for t in range(n - 1):
-            discount = 1
-            for k in range(t, n - 1):
-                advantages[t] += (
-                    discount
-                    * (
-                        self.rewards[k]
-                        + gamma * self.values[k + 1] * (1 - int(self.goals[k]))
-                    )
-                    - self.values[k]
-                )
-                discount *= gamma * gae_lambda
-        return list(advantages)
+        return compute_advantages(self.rewards, self.values, self.goals, [len(self)], gamma, gae_lambda)
 
     def __len__(self):
         return len(self.goals)
 
     def total_reward(self) -> float:
-        return sum(self.rewards)
\ No newline at end of file
+        return sum(self.rewards)
+
+
+def compute_advantages(
+    rewards: np.ndarray,
+    values: np.ndarray,
+    goals: np.ndarray,
+    lengths: list[int],
+    gamma: float,
+    gae_lambda: float,
+) -> np.ndarray:
+    # GAE as a reverse scan, A[t] = delta[t] + gamma * lambda * A[t + 1]. The steps of the episodes are stored one
+    # after the other, they are padded into one matrix so every step of the scan handles all episodes at once
+    lengths = np.asarray(lengths, dtype=np.int64)
+    n = int(lengths.max(initial=0))
+    starts = np.cumsum(lengths) - lengths
+    steps = np.arange(n)
+    valid = steps < lengths[:, None]
+    index = np.where(valid, starts[:, None] + steps, 0)
+
+    rewards = np.where(valid, np.asarray(rewards, dtype=np.float64)[index], 0.0)
+    values = np.where(valid, np.asarray(values, dtype=np.float64)[index], 0.0)
+    not_goals = np.where(valid, np.logical_not(np.asarray(goals)[index]), 0.0)
+
+    deltas = rewards[:, :-1] + gamma * values[:, 1:] * not_goals[:, :-1] - values[:, :-1]
+    # The last step of an episode has no next value, it and the padding after it keep an advantage of 0
+    deltas[steps[:-1] >= lengths[:, None] - 1] = 0.0
+
+    advantages = np.zeros((len(lengths), n))
+    for t in range(n - 2, -1, -1):
+        advantages[:, t] = deltas[:, t] + gamma * gae_lambda * advantages[:, t + 1]
+    return advantages[valid]
@@ -1,6 +1,6 @@
 import utils
 from buffer.base import Buffer
-from buffer.episode import Episode
+from buffer.episode import Episode, compute_advantages
 from collections import deque
 import numpy as np
 
@@ -11,47 +11,95 @@ class BufferPPO(Buffer):
         batch_size: int,
         gamma: float,
         gae_lambda: float,
+        max_steps: int,
+        state_dim: int,
+        action_dim: int,
         shuffle: bool = True,
     ) -> None:
         super().__init__(max_size, batch_size, shuffle)
         self.gamma = gamma
         self.gae_lambda = gae_lambda
-        self.episodes = deque(maxlen=max_size)
-        self.advantages = deque(maxlen=max_size)
+        # The lengths of the stored episodes, their steps are stored one after the other from start to end of the columns
+        self.episodes = deque()
+        self.start = 0
+        self.end = 0
+
+        # One player makes at most max_steps moves in an episode. Twice the room of max_size episodes, so the steps are
+        # moved back to the start of the columns at most once every max_size added episodes
+        capacity = 2 * max_size * max_steps
+        self.states = np.zeros((capacity, state_dim), dtype=np.uint8)
+        self.actions = np.zeros(capacity, dtype=np.int16)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.goals = np.zeros(capacity, dtype=bool)
+        self.probs = np.zeros(capacity, dtype=np.float32)
+        self.values = np.zeros(capacity, dtype=np.float32)
+        self.masks = np.zeros((capacity, (action_dim + 7) // 8), dtype=np.uint8)
+        self.advantages = np.zeros(capacity, dtype=np.float32)
+
+    def get_columns(self) -> tuple[np.ndarray, ...]:
+        return (
+            self.states,
+            self.actions,
+            self.rewards,
+            self.goals,
+            self.probs,
+            self.values,
+            self.masks,
+            self.advantages,
+        )
 
     def add(self, episode: Episode):
-        self.episodes.append(episode)
-        self.advantages.append(episode.calc_advantage(self.gamma, self.gae_lambda))
+        n = len(episode)
+        if n == 0:
+            return
+
+        # Like a deque with a maxlen, the oldest episode makes room for the new one
+        if len(self.episodes) >= self.max_size:
+            self.start += self.episodes.popleft()
+        if self.end + n > len(self.states):
+            self.compact()
+
+        start, end = self.end, self.end + n
+        self.states[start:end] = episode.states
+        self.actions[start:end] = episode.actions
+        self.rewards[start:end] = episode.rewards
+        self.goals[start:end] = episode.goals
+        self.probs[start:end] = episode.probs
+        self.values[start:end] = episode.values
+        self.masks[start:end] = episode.masks
+        self.episodes.append(n)
+        self.end = end
+
+    def compact(self) -> None:
+        # Move the stored steps back to the start of the columns, the room of the removed episodes is reused
+        for column in self.get_columns():
+            column[:self.end - self.start] = column[self.start:self.end]
+        self.end -= self.start
+        self.start = 0
 
     def clear(self) -> None:
         self.episodes.clear()
-        self.advantages.clear()
+        self.start = 0
+        self.end = 0
 
     def get_len(self) -> int:
         return len(self.episodes)
 
     def sample(self):
-        probs = sum(map(lambda x: x.probs, self.episodes), [])
-        goals = sum(map(lambda x: x.goals, self.episodes), [])
-        masks = sum(map(lambda x: x.masks, self.episodes), [])
-        values = sum(map(lambda x: x.values, self.episodes), [])
-        states = sum(map(lambda x: x.states, self.episodes), [])
-        actions = sum(map(lambda x: x.actions, self.episodes), [])
-        rewards = sum(map(lambda x: x.rewards, self.episodes), [])
-        advantages = sum(self.advantages, [])
-
-        batches = utils.make_batch_ids(
-            n=len(states), batch_size=self.batch_size, shuffle=self.shuffle
+        # The advantages of all stored episodes in one batched scan, once per learn
+        stored = slice(self.start, self.end)
+        self.advantages[stored] = compute_advantages(
+            self.rewards[stored], self.values[stored], self.goals[stored], list(self.episodes),
+            self.gamma, self.gae_lambda,
         )
 
+        # The stored steps are contiguous, so the columns are returned as views and only the batches are new
         return (
-            np.array(states),
-            np.array(actions),
-            np.array(rewards),
-            np.array(goals),
-            np.array(probs),
-            np.array(values),
-            np.array(masks),
-            np.array(advantages),
-            batches,
+            *(column[stored] for column in self.get_columns()),
+            self.make_batches(self.end - self.start),
+        )
+
+    def make_batches(self, n: int) -> list[np.ndarray]:
+        return utils.make_batch_ids(
+            n=n, batch_size=self.batch_size, shuffle=self.shuffle
         )
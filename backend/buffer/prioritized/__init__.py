@@ -0,0 +1 @@
+from .module import BufferPrioritized, SumTree
\ No newline at end of file
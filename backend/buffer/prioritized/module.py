@@ -0,0 +1,103 @@
+import numpy as np
+
+from buffer.dqn import BufferDQN
+from buffer.episode import Episode
+
+
+class SumTree:
+    def __init__(self, capacity: int) -> None:
+        # A complete binary tree in one array, node i has children 2i and 2i + 1 and the leaves start at self.leaves
+        self.leaves = 1 << max(capacity - 1, 0).bit_length()
+        self.depth = self.leaves.bit_length() - 1
+        self.tree = np.zeros(2 * self.leaves)
+
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def get(self, indices: np.ndarray) -> np.ndarray:
+        return self.tree[indices + self.leaves]
+
+    def update(self, indices: np.ndarray, priorities: np.ndarray) -> None:
+        # The parents are summed again level by level, so a batch costs O(batch * log n)
+        nodes = np.asarray(indices) + self.leaves
+        self.tree[nodes] = priorities
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        # Walks down for every value at once, going right when the value is past the sum of the left child
+        nodes = np.ones(len(values), dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            right = values > self.tree[left]
+            values -= np.where(right, self.tree[left], 0.0)
+            nodes = left + right
+        return nodes - self.leaves
+
+
+class BufferPrioritized(BufferDQN):
+    def __init__(
+            self,
+            max_size: int,
+            batch_size: int,
+            gamma: float,
+            n_steps: int,
+            max_steps: int,
+            state_dim: int,
+            action_dim: int,
+            alpha: float = 0.6,
+            beta: float = 0.4,
+            epsilon: float = 1e-6,
+            shuffle: bool = True
+    ) -> None:
+        super().__init__(max_size, batch_size, gamma, n_steps, max_steps, state_dim, action_dim, shuffle)
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self.tree = SumTree(self.capacity)
+        self.max_priority = 1.0
+
+    def add(self, episode: Episode) -> int:
+        start = self.position
+        n = super().add(episode)
+        # New transitions get the highest priority so far, so every transition is learned from at least once
+        indices = (start + np.arange(n)) % self.capacity
+        self.tree.update(indices, np.full(n, self.max_priority ** self.alpha))
+        return n
+
+    def clear(self) -> None:
+        super().clear()
+        self.tree = SumTree(self.capacity)
+        self.max_priority = 1.0
+
+    def sample(self, batch_size: int = None):
+        # One value from every equal part of the total priority, which spreads the batch over the buffer
+        batch_size = batch_size or self.batch_size
+        total = self.tree.total()
+        values = (np.arange(batch_size) + np.random.random(batch_size)) * total / batch_size
+        indices = np.minimum(self.tree.find(values), self.size - 1)
+
+        # Importance sampling weights undo the bias of sampling by priority, scaled so the largest weight is 1
+        probs = self.tree.get(indices) / total
+        weights = (self.size * probs) ** -self.beta
+        weights /= weights.max()
+
+        return (
+            self.states[indices],
+            self.actions[indices],
+            self.returns[indices],
+            self.next_states[indices],
+            self.next_masks[indices],
+            self.dones[indices],
+            self.discounts[indices],
+            weights.astype(np.float32),
+            indices,
+        )
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray) -> None:
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        # A transition sampled twice in one batch keeps the priority of its last error
+        self.tree.update(indices, priorities ** self.alpha)
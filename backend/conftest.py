@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules import each other from the backend folder, e.g. `from buffer.episode import Episode`
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -1,105 +1,9 @@
-import os
-import gym
-import numpy as np
 import torch as T
-import torch.optim as optim
 
-from tqdm import tqdm
-from buffer.ppo import BufferPPO
-from buffer.episode import Episode
+from learnings.actor_critic_learning import ActorCriticLearning
 
-from learnings.base import Learning
-from learnings.actor import Actor
-from learnings.critic import Critic
 
-
-class A2C(Learning):
-    def __init__(
-            self,
-            environment: gym.Env,
-            hidden_layers: tuple[int, ...],
-            epochs: int,
-            buffer_size: int,
-            batch_size: int,
-            gamma: float,
-            gae_lambda: float,
-            learning_rate: float,
-    ) -> None:
-        super().__init__(environment, epochs, gamma, learning_rate)
-
-        self.gae_lambda = gae_lambda
-        self.buffer = BufferPPO(
-            gamma=gamma,
-            max_size=buffer_size,
-            batch_size=batch_size,
-            gae_lambda=gae_lambda,
-        )
-
-        self.hidden_layers = hidden_layers
-        self.actor = Actor(self.state_dim, self.action_dim, hidden_layers)
-        self.critic = Critic(self.state_dim, hidden_layers)
-        self.actor_optimizer = optim.Adam(self.actor.parameters(), lr=learning_rate)
-        self.critic_optimizer = optim.Adam(self.critic.parameters(), lr=learning_rate)
-
-        self.to(self.device)
-
-    def take_action(self, state: np.ndarray, action_mask: np.ndarray):
-        self.action_dim = len(action_mask)
-        state = T.Tensor(state).unsqueeze(0).to(self.device)
-        action_mask = T.Tensor(action_mask).unsqueeze(0).to(self.device)
-        dist = self.actor(state, action_mask)
-        action = dist.sample()
-        probs = T.squeeze(dist.log_prob(action)).item()
-        value = T.squeeze(self.critic(state)).item()
-        action = T.squeeze(action).item()
-        return action, probs, value
-
-    def epoch(self):
-        (
-            states_arr,
-            actions_arr,
-            rewards_arr,
-            goals_arr,
-            old_probs_arr,
-            values_arr,
-            masks_arr,
-            advantages_arr,
-            batches,
-        ) = self.buffer.sample()
-
-        for batch in batches:
-            masks = T.Tensor(masks_arr[batch]).to(self.device)
-            values = T.Tensor(values_arr[batch]).to(self.device)
-            states = T.Tensor(states_arr[batch]).to(self.device)
-            actions = T.Tensor(actions_arr[batch]).to(self.device)
-            old_probs = T.Tensor(old_probs_arr[batch]).to(self.device)
-            advantages = T.Tensor(advantages_arr[batch]).to(self.device)
-
-            dist = self.actor(states, masks)
-            critic_value = T.squeeze(self.critic(states))
-
-            new_probs = dist.log_prob(actions)
-            prob_ratio = (new_probs - old_probs).exp()
-
-            weighted_probs = advantages * prob_ratio
-
-            actor_loss = -weighted_probs.mean()
-            critic_loss = ((advantages + values - critic_value) ** 2).mean()
-            total_loss = actor_loss + 0.5 * critic_loss
-
-            self.actor_optimizer.zero_grad()
-            self.critic_optimizer.zero_grad()
-            total_loss.backward()
-            self.actor_optimizer.step()
-            self.critic_optimizer.step()
-
-    def learn(self):
-        for epoch in tqdm(range(self.epochs), desc="A2C Learning...", ncols=64, leave=False):
-            self.epoch()
-        self.buffer.clear()
-
-    def remember(self, episode: Episode):
-        self.buffer.add(episode)
-
-    def save(self, folder: str, name: str):
-        T.save(self, os.path.join(folder, f"{name}.pt"))
+class A2C(ActorCriticLearning):
+    def get_actor_loss(self, prob_ratio: T.Tensor, advantages: T.Tensor) -> T.Tensor:
+        weighted_probs = advantages * prob_ratio
+        return -weighted_probs.mean()
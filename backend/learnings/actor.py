@@ -5,22 +5,55 @@ import torch.nn.functional as F
 
 from utils import build_base_model
 from torch.distributions.categorical import Categorical
+from torch.distributions.utils import lazy_property
+
+# Low enough to give illegal actions no probability, finite so the entropy and log_prob do not become nan
+MASKED_LOGIT = -1e9
+
+
+class MaskedCategorical(Categorical):
+    def __init__(self, logits: T.Tensor, validate_args: bool | None = None) -> None:
+        # Categorical(logits=...) normalizes with a logsumexp, which is much slower on the cpu than softmax. The
+        # probabilities come from softmax, the normalized logits are only computed when log_prob or entropy need them
+        self.unnormalized_logits = logits
+        super().__init__(probs=F.softmax(logits, dim=-1), validate_args=validate_args)
+
+    @lazy_property
+    def logits(self) -> T.Tensor:
+        # From log_softmax instead of the log of the probabilities, so log_prob stays exact where that log is clamped
+        return F.log_softmax(self.unnormalized_logits, dim=-1)
+
+    def expand(self, batch_shape: T.Size, _instance: "MaskedCategorical | None" = None) -> "MaskedCategorical":
+        new = self._get_checked_instance(MaskedCategorical, _instance)
+        new.unnormalized_logits = self.unnormalized_logits.expand(T.Size(batch_shape) + (self._num_events,))
+        return super().expand(batch_shape, _instance=new)
 
 
 class Actor(nn.Module):
     def __init__(
-        self, state_dim: int, action_dim: int, hidden_layers: tuple[int]
+        self, state_dim: int, action_dim: int, hidden_layers: tuple[int], masked_logits: bool = False
     ) -> None:
         super().__init__()
         self.state_dim = state_dim
         self.action_dim = action_dim
         self.hidden_layers = hidden_layers
+        self.masked_logits = masked_logits
         self.base_model = build_base_model(
-            state_dim, hidden_layers, action_dim, nn.Softmax(dim=1)
+            state_dim, hidden_layers, action_dim, nn.Identity() if masked_logits else nn.Softmax(dim=1)
         )
 
     def forward(self, states: T.Tensor, action_mask: T.Tensor):
-        x = self.base_model(states)
+        if self.masked_logits:
+            return self.mask_logits(self.base_model(states), action_mask)
+        return self.mask_distribution(self.base_model(states), action_mask)
+
+    @staticmethod
+    def mask_logits(x: T.Tensor, action_mask: T.Tensor) -> Categorical:
+        # The illegal actions are left with no probability
+        return MaskedCategorical(x.masked_fill(action_mask == 0, MASKED_LOGIT), validate_args=False)
+
+    @staticmethod
+    def mask_distribution(x: T.Tensor, action_mask: T.Tensor) -> Categorical:
         s = action_mask.sum(dim=1)
         l = ((x * (1 - action_mask)).sum(dim=1) / s).unsqueeze(1)
         x = (x + l) * action_mask
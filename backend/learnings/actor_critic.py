@@ -0,0 +1,40 @@
+import torch as T
+import torch.nn as nn
+from torch.distributions.categorical import Categorical
+
+from learnings.actor import Actor
+from learnings.factorized_actor import FactorizedCategorical, FactorizedHead
+from utils import build_trunk
+
+
+class ActorCritic(nn.Module):
+    def __init__(
+        self, state_dim: int, action_dim: int, hidden_layers: tuple[int], masked_logits: bool = False,
+        factorized: bool = False
+    ) -> None:
+        super().__init__()
+        self.state_dim = state_dim
+        self.action_dim = action_dim
+        self.hidden_layers = hidden_layers
+        self.masked_logits = masked_logits
+        self.factorized = factorized
+
+        # One hidden stack for both heads, so a forward pass runs it once instead of once per network
+        self.trunk = build_trunk(state_dim, hidden_layers)
+        if factorized:
+            self.policy_head = FactorizedHead(hidden_layers[-1])
+        else:
+            self.policy_head = nn.Sequential(
+                nn.Linear(hidden_layers[-1], action_dim), nn.Identity() if masked_logits else nn.Softmax(dim=1)
+            )
+        self.value_head = nn.Linear(hidden_layers[-1], 1)
+
+    def forward(self, states: T.Tensor, action_mask: T.Tensor) -> tuple[Categorical | FactorizedCategorical, T.Tensor]:
+        x = self.trunk(states)
+        if self.factorized:
+            dist = self.policy_head(x, action_mask)
+        elif self.masked_logits:
+            dist = Actor.mask_logits(self.policy_head(x), action_mask)
+        else:
+            dist = Actor.mask_distribution(self.policy_head(x), action_mask)
+        return dist, self.value_head(x).squeeze(-1)
@@ -0,0 +1,138 @@
+from abc import abstractmethod
+
+import gym
+import numpy as np
+import torch as T
+import torch.optim as optim
+from torch.distributions.categorical import Categorical
+
+from tqdm import tqdm
+from buffer.ppo import BufferPPO
+from buffer.episode import Episode
+
+from learnings.base import Learning
+from learnings.actor import Actor
+from learnings.critic import Critic
+from learnings.actor_critic import ActorCritic
+from learnings.factorized_actor import FactorizedActor
+from aow.game.action_codec import FACTORIZED_LENGTH
+from learnings.rollout_tensors import RolloutTensors
+
+
+class ActorCriticLearning(Learning):
+    # The learners with a policy and a value network, which only differ in the loss of the policy
+    def __init__(
+        self,
+        environment: gym.Env,
+        hidden_layers: tuple[int, ...],
+        epochs: int,
+        buffer_size: int,
+        batch_size: int,
+        gamma: float,
+        gae_lambda: float,
+        learning_rate: float,
+        shared: bool = False,
+        masked_logits: bool = False,
+        factorized: bool = False,
+    ) -> None:
+        super().__init__(environment, epochs, gamma, learning_rate)
+        self.factorized = factorized
+        if factorized:
+            # The buffer remembers the sources and the destinations of the taken source instead of every action id
+            self.action_dim = FACTORIZED_LENGTH
+
+        self.gae_lambda = gae_lambda
+        self.buffer = BufferPPO(
+            gamma=gamma,
+            max_size=buffer_size,
+            batch_size=batch_size,
+            gae_lambda=gae_lambda,
+            max_steps=self.max_steps,
+            state_dim=self.state_dim,
+            action_dim=self.action_dim,
+        )
+
+        self.hidden_layers = hidden_layers
+        self.shared = shared
+        self.masked_logits = masked_logits
+        if shared:
+            self.actor_critic = ActorCritic(self.state_dim, self.action_dim, hidden_layers, masked_logits, factorized)
+            self.optimizer = optim.Adam(self.actor_critic.parameters(), lr=learning_rate)
+        else:
+            if factorized:
+                self.actor = FactorizedActor(self.state_dim, hidden_layers)
+            else:
+                self.actor = Actor(self.state_dim, self.action_dim, hidden_layers, masked_logits)
+            self.critic = Critic(self.state_dim, hidden_layers)
+            self.actor_optimizer = optim.Adam(self.actor.parameters(), lr=learning_rate)
+            self.critic_optimizer = optim.Adam(self.critic.parameters(), lr=learning_rate)
+
+        self.to(self.device)
+
+    def act(self, states: np.ndarray, masks: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        states, masks = self.get_inputs(states, masks)
+        with T.inference_mode():
+            dist, values = self.evaluate(states, masks)
+            actions = dist.sample()
+            probs = dist.log_prob(actions)
+            # One copy to the cpu for the three results, the actions are exact as float32
+            results = T.stack([actions.float(), probs, values]).cpu().numpy()
+        return results[0].astype(np.int64), results[1], results[2]
+
+    def evaluate(self, states: T.Tensor, masks: T.Tensor) -> tuple[Categorical, T.Tensor]:
+        if self.shared:
+            return self.actor_critic(states, masks)
+        return self.actor(states, masks), self.critic(states).squeeze(-1)
+
+    @abstractmethod
+    def get_actor_loss(self, prob_ratio: T.Tensor, advantages: T.Tensor) -> T.Tensor:
+        pass
+
+    def epoch(self, tensors: RolloutTensors):
+        batches = self.buffer.make_batches(len(tensors))
+        for states, actions, old_probs, values, masks, advantages in tensors.get_batches(batches):
+            dist, critic_value = self.evaluate(states, masks)
+
+            new_probs = dist.log_prob(actions)
+            prob_ratio = (new_probs - old_probs).exp()
+
+            actor_loss = self.get_actor_loss(prob_ratio, advantages)
+            critic_loss = ((advantages + values - critic_value) ** 2).mean()
+            total_loss = actor_loss + 0.5 * critic_loss
+
+            optimizers = self.get_optimizers().values()
+            for optimizer in optimizers:
+                optimizer.zero_grad()
+            total_loss.backward()
+            for optimizer in optimizers:
+                optimizer.step()
+
+    def learn(self):
+        tensors = RolloutTensors(self.buffer.sample(), self.device, self.action_dim)
+        for epoch in tqdm(range(self.epochs), desc=f"{type(self).__name__} Learning...", ncols=64, leave=False):
+            self.epoch(tensors)
+        self.buffer.clear()
+        self.learn_steps += 1
+
+    def remember(self, episode: Episode):
+        self.buffer.add(episode)
+
+    def get_optimizers(self) -> dict[str, T.optim.Optimizer]:
+        if self.shared:
+            return {"actor_critic": self.optimizer}
+        return {"actor": self.actor_optimizer, "critic": self.critic_optimizer}
+
+    def get_config(self) -> dict:
+        return {
+            **super().get_config(),
+            "hidden_layers": self.hidden_layers,
+            "buffer_size": self.buffer.max_size,
+            "batch_size": self.buffer.batch_size,
+            "gae_lambda": self.gae_lambda,
+            "shared": self.shared,
+            "masked_logits": self.masked_logits,
+            "factorized": self.factorized,
+        }
+
+    def save(self, folder: str, name: str):
+        self.save_checkpoint(folder, name)
@@ -1,9 +1,15 @@
+import os
+import threading
+
 import gym
 import torch as T
 import torch.nn as nn
 import numpy as np
 from abc import ABC, abstractmethod
 
+from aow.game.action_codec import ActionCodec
+from utils.checkpoint import write_checkpoint
+
 
 class Learning(nn.Module, ABC):
     def __init__(
@@ -16,17 +22,89 @@ class Learning(nn.Module, ABC):
         super().__init__()
         self.state_dim = environment.aow_logic.observation_space.shape[0]
         self.action_dim = environment.aow_logic.action_space.n
+        self.max_steps = environment.aow_logic.max_steps
 
         self.gamma = gamma
         self.epochs = epochs
         self.learning_rate = learning_rate
+        self.learn_steps = 0
+        # A factorized learner picks source x destination pairs, see ActionCodec, instead of action ids
+        self.factorized = False
 
         self.device = T.device("cuda:0" if T.cuda.is_available() else "cpu")
 
+        # The inputs of act are kept between calls and only grow when a larger batch comes in. The API acts from
+        # several threads at once, so every thread gets its own
+        self.inputs = threading.local()
+
+    def __getstate__(self) -> dict:
+        # Thread locals can not be copied or pickled, the workers start with empty inputs
+        state = super().__getstate__()
+        del state["inputs"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        super().__setstate__(state)
+        self.inputs = threading.local()
+
+    def get_inputs(self, states: np.ndarray, masks: np.ndarray) -> tuple[T.Tensor, T.Tensor]:
+        n = len(states)
+        inputs = self.inputs
+        # Packed masks, see ActionCodec.get_table, stay packed
+        mask_dtype = T.uint8 if masks.dtype == np.uint8 else T.float32
+        if (
+            getattr(inputs, "states", None) is None or len(inputs.states) < n
+            or inputs.masks.shape[1] != masks.shape[1] or inputs.masks.dtype != mask_dtype
+        ):
+            pin_memory = self.device.type == "cuda"
+            inputs.states = T.zeros((n, self.state_dim), dtype=T.float32, pin_memory=pin_memory)
+            inputs.masks = T.zeros((n, masks.shape[1]), dtype=mask_dtype, pin_memory=pin_memory)
+
+        # Written through numpy, which converts the dtypes in place and accepts read-only masks
+        inputs.states.numpy()[:n] = states
+        inputs.masks.numpy()[:n] = masks
+        return (
+            inputs.states[:n].to(self.device, non_blocking=True),
+            inputs.masks[:n].to(self.device, non_blocking=True),
+        )
+
     @abstractmethod
-    def take_action(self, state: np.ndarray, *args):
+    def act(self, states: np.ndarray, masks: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
         pass
 
+    def take_action(self, state: np.ndarray, action_mask: np.ndarray):
+        actions, probs, values = self.act(state[None], action_mask[None])
+        return int(actions[0]), float(probs[0]), float(values[0])
+
+    def choose_action(self, state: np.ndarray, actions: tuple) -> tuple[int, int, float, float, np.ndarray]:
+        # Returns the action id to step with, then the action, prob, value and mask to remember
+        source_pos, possibles, mask = actions
+        if not self.factorized:
+            action, prob, value = self.take_action(state, mask)
+            return action, action, prob, value, mask
+
+        table = ActionCodec.get_table(source_pos, possibles, mask)
+        pair, prob, value = self.take_action(state, table)
+        return ActionCodec.decode(pair, source_pos, possibles, mask), pair, prob, value, ActionCodec.get_mask(table, pair)
+
+    def choose_actions(self, states: np.ndarray, actions: list[tuple]) -> list[tuple[int, int, float, float, np.ndarray]]:
+        # choose_action for several games with one forward pass
+        if not self.factorized:
+            masks = [mask for _, _, mask in actions]
+            chosen, probs, values = self.act(states, np.stack(masks))
+            return [
+                (int(action), int(action), float(prob), float(value), mask)
+                for action, prob, value, mask in zip(chosen, probs, values, masks)
+            ]
+
+        tables = [ActionCodec.get_table(*game_actions) for game_actions in actions]
+        pairs, probs, values = self.act(states, np.stack(tables))
+        return [
+            (ActionCodec.decode(int(pair), *game_actions), int(pair), float(prob), float(value),
+             ActionCodec.get_mask(table, int(pair)))
+            for pair, prob, value, game_actions, table in zip(pairs, probs, values, actions, tables)
+        ]
+
     @abstractmethod
     def learn(self):
         pass
@@ -38,3 +116,36 @@ class Learning(nn.Module, ABC):
     @abstractmethod
     def save(self, folder: str):
         pass
+
+    def get_optimizers(self) -> dict[str, T.optim.Optimizer]:
+        return {}
+
+    def get_config(self) -> dict:
+        return {"epochs": self.epochs, "gamma": self.gamma, "learning_rate": self.learning_rate}
+
+    def get_counters(self) -> dict:
+        return {"learn_steps": self.learn_steps}
+
+    def set_counters(self, counters: dict) -> None:
+        self.learn_steps = counters["learn_steps"]
+
+    def get_checkpoint(self) -> dict:
+        # Only the state needed to continue training, the buffer is not part of it
+        return {
+            "model": self.state_dict(),
+            "optimizers": {name: optimizer.state_dict() for name, optimizer in self.get_optimizers().items()},
+            "config": self.get_config(),
+            "counters": self.get_counters(),
+        }
+
+    def load_checkpoint(self, checkpoint: dict) -> None:
+        self.load_state_dict(checkpoint["model"])
+        for name, optimizer in self.get_optimizers().items():
+            optimizer.load_state_dict(checkpoint["optimizers"][name])
+        self.set_counters(checkpoint["counters"])
+
+    def save_checkpoint(self, folder: str, name: str) -> None:
+        write_checkpoint(self.get_checkpoint(), os.path.join(folder, f"{name}.pt"))
+
+    def load(self, folder: str, name: str) -> None:
+        self.load_checkpoint(T.load(os.path.join(folder, f"{name}.pt"), map_location=self.device, weights_only=False))
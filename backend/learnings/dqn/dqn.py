@@ -8,9 +8,8 @@ class DQN(nn.Module):
         self.state_dim = state_dim
         self.action_dim = action_dim
         self.hidden_layers = hidden_layers
-        self.model = build_base_model(
-            state_dim, hidden_layers, action_dim, nn.Softmax(dim=1)
-        )
+        # Q-values are not bounded, so the last layer has no activation
+        self.model = build_base_model(state_dim, hidden_layers, action_dim)
 
     def forward(self, x):
         return self.model(x)
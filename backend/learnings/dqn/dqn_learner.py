@@ -1,10 +1,15 @@
+from copy import deepcopy
+
 import gym
 import numpy as np
 import torch as T
+import torch.nn.functional as F
 from tqdm import tqdm
 
+import utils
 from buffer.dqn import BufferDQN
 from buffer.episode import Episode
+from buffer.prioritized import BufferPrioritized
 from learnings.base import Learning
 from learnings.dqn.dqn import DQN
 
@@ -23,7 +28,11 @@ class DQNLearner(Learning):
             epsilon_decay: float,
             epsilon_min: float,
             tau: float,
-            update_every: int
+            update_every: int,
+            n_steps: int = 1,
+            prioritized: bool = False,
+            alpha: float = 0.6,
+            beta: float = 0.4,
     ) -> None:
         super().__init__(environment, epochs, gamma, learning_rate)
         self.hidden_layers = hidden_layers
@@ -34,63 +43,129 @@ class DQNLearner(Learning):
         self.epsilon_min = epsilon_min
         self.tau = tau
         self.update_every = update_every
-
-        self.buffer = BufferDQN(
-            max_size=buffer_size,
-            batch_size=batch_size,
-            gamma=gamma,
-            tau=tau
-        )
+        self.n_steps = n_steps
+        self.prioritized = prioritized
+
+        if prioritized:
+            self.buffer = BufferPrioritized(
+                max_size=buffer_size,
+                batch_size=batch_size,
+                gamma=gamma,
+                n_steps=n_steps,
+                max_steps=self.max_steps,
+                state_dim=self.state_dim,
+                action_dim=self.action_dim,
+                alpha=alpha,
+                beta=beta,
+            )
+        else:
+            self.buffer = BufferDQN(
+                max_size=buffer_size,
+                batch_size=batch_size,
+                gamma=gamma,
+                n_steps=n_steps,
+                max_steps=self.max_steps,
+                state_dim=self.state_dim,
+                action_dim=self.action_dim,
+            )
 
         self.dqn = DQN(self.state_dim, self.action_dim, hidden_layers)
+        # The target network follows the online network slowly, see soft_update
+        self.target_dqn = deepcopy(self.dqn).requires_grad_(False)
         self.optimizer = T.optim.Adam(self.dqn.parameters(), lr=learning_rate)
 
         self.to(self.device)
 
-    def take_action(self, state: np.array, action_mask: np.array):
-        state = T.Tensor(state).unsqueeze(0).to(self.device)
-        action_mask = T.Tensor(action_mask).unsqueeze(0).to(self.device)
-        action_values = self.dqn(state)
-        action_values = action_values * action_mask
-        # these two might not work
-        probs = T.nn.functional.softmax(action_values, dim=1)
-        value = T.max(action_values).item()
-
-        action = T.argmax(action_values).item()
-        return action, probs, value
+    def act(self, states: np.ndarray, masks: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        states, masks = self.get_inputs(states, masks)
+        masks = masks.bool()
+        with T.inference_mode():
+            action_values = self.dqn(states).masked_fill(~masks, -T.inf)
+            greedy_actions = action_values.argmax(dim=1)
+            # A random legal action is the legal action with the highest random score
+            random_actions = T.rand(action_values.shape, device=self.device).masked_fill(~masks, -1).argmax(dim=1)
+            explore = T.rand(len(states), device=self.device) < self.epsilon
+            actions = T.where(explore, random_actions, greedy_actions)
+
+            # The probability of the action under the epsilon-greedy policy
+            probs = self.epsilon / masks.sum(dim=1) + (1 - self.epsilon) * (actions == greedy_actions)
+            values = action_values.gather(1, greedy_actions.unsqueeze(-1)).squeeze(-1)
+            results = T.stack([actions.float(), probs.float(), values]).cpu().numpy()
+        return results[0].astype(np.int64), results[1], results[2]
 
     def epoch(self):
         if len(self.buffer) < self.batch_size:
             return
 
         for _ in range(self.update_every):
-            states, actions, rewards, next_states, dones = self.buffer.sample(self.batch_size)
+            states, actions, returns, next_states, next_masks, dones, discounts, *priority = self.buffer.sample(
+                self.batch_size)
 
-            states = T.Tensor(states).to(self.device)
-            actions = T.Tensor(actions).to(self.device)
-            rewards = T.Tensor(rewards).to(self.device)
-            next_states = T.Tensor(next_states).to(self.device)
-            dones = T.Tensor(dones).to(self.device)
+            states = T.as_tensor(states, dtype=T.float32, device=self.device)
+            actions = T.as_tensor(actions, dtype=T.int64, device=self.device)
+            returns = T.as_tensor(returns, dtype=T.float32, device=self.device)
+            next_states = T.as_tensor(next_states, dtype=T.float32, device=self.device)
+            next_masks = utils.unpack_masks(T.as_tensor(next_masks, device=self.device), self.action_dim).bool()
+            dones = T.as_tensor(dones, device=self.device)
+            discounts = T.as_tensor(discounts, dtype=T.float32, device=self.device)
 
             curr_Q = self.dqn(states).gather(1, actions.unsqueeze(-1)).squeeze(-1)
-            next_Q = self.dqn(next_states).max(dim=1)[0]
-            target_Q = rewards + (self.gamma * next_Q * (1 - dones))
-
-            loss = F.mse_loss(curr_Q, target_Q.detach())
+            with T.no_grad():
+                next_Q = self.target_dqn(next_states).masked_fill(~next_masks, -T.inf).max(dim=1)[0]
+                target_Q = returns + discounts * T.where(dones, T.zeros_like(next_Q), next_Q)
+
+            if self.prioritized:
+                weights, indices = priority
+                td_errors = target_Q - curr_Q
+                self.buffer.update_priorities(indices, utils.tensor_to_numpy(td_errors))
+                loss = (T.as_tensor(weights, device=self.device) * td_errors ** 2).mean()
+            else:
+                loss = F.mse_loss(curr_Q, target_Q)
             self.optimizer.zero_grad()
             loss.backward()
             self.optimizer.step()
+            self.soft_update()
 
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
 
+    def soft_update(self):
+        with T.no_grad():
+            for target_param, param in zip(self.target_dqn.parameters(), self.dqn.parameters()):
+                target_param.lerp_(param, self.tau)
+
     def learn(self):
+        # The transitions are off-policy, so the buffer is kept between learns and only overwritten when it is full
         for _ in tqdm(range(self.epochs), desc="DQN Learning", ncols=64, leave=False):
             self.epoch()
-        self.buffer.clear()
+        self.learn_steps += 1
 
     def remember(self, episode: Episode):
         self.buffer.add(episode)
 
+    def get_optimizers(self) -> dict[str, T.optim.Optimizer]:
+        return {"dqn": self.optimizer}
+
+    def get_config(self) -> dict:
+        return {
+            **super().get_config(),
+            "hidden_layers": self.hidden_layers,
+            "buffer_size": self.buffer_size,
+            "batch_size": self.batch_size,
+            "epsilon_decay": self.epsilon_decay,
+            "epsilon_min": self.epsilon_min,
+            "tau": self.tau,
+            "update_every": self.update_every,
+            "n_steps": self.n_steps,
+            "prioritized": self.prioritized,
+        }
+
+    def get_counters(self) -> dict:
+        return {**super().get_counters(), "epsilon": self.epsilon}
+
+    def set_counters(self, counters: dict) -> None:
+        super().set_counters(counters)
+        self.epsilon = counters["epsilon"]
+
     def save(self, folder: str, name: str = "dqn"):
-        T.save(self.dqn.state_dict(), f"{folder}/{name}.pt")
+        self.save_checkpoint(folder, name)
@@ -0,0 +1,79 @@
+import torch as T
+import torch.nn as nn
+import torch.nn.functional as F
+
+from aow.game.action_codec import SQUARE_BYTES, SQUARES
+from learnings.actor import Actor
+from utils import build_trunk, unpack_masks
+
+
+class FactorizedCategorical:
+    def __init__(self, head: "FactorizedHead", x: T.Tensor, masks: T.Tensor) -> None:
+        # The actions are source * 64 + destination, the destination is chosen knowing the source. The masks to act
+        # with are the packed table of ActionCodec.get_table, the remembered masks only hold the destinations of the
+        # taken source
+        self.head = head
+        self.x = x
+        self.masks = masks
+        self.packed = masks.dtype == T.uint8
+        source_masks = unpack_masks(masks[:, :SQUARE_BYTES], SQUARES) if self.packed else masks[:, :SQUARES]
+        self.sources = Actor.mask_logits(head.source_head(x), source_masks)
+        # The destinations of the last log_prob, their entropy is all the remembered masks give
+        self.destinations = None
+
+    def get_destinations(self, sources: T.Tensor):
+        if self.packed:
+            rows = self.masks[:, SQUARE_BYTES:].view(-1, SQUARES, SQUARE_BYTES)[T.arange(len(sources)), sources]
+            masks = unpack_masks(rows, SQUARES)
+        else:
+            masks = self.masks[:, SQUARES:]
+        x = T.cat([self.x, F.one_hot(sources, SQUARES).to(self.x.dtype)], dim=1)
+        return Actor.mask_logits(self.head.destination_head(x), masks)
+
+    def sample(self) -> T.Tensor:
+        sources = self.sources.sample()
+        return sources * SQUARES + self.get_destinations(sources).sample()
+
+    def log_prob(self, actions: T.Tensor) -> T.Tensor:
+        sources = T.div(actions, SQUARES, rounding_mode="floor")
+        self.destinations = self.get_destinations(sources)
+        return self.sources.log_prob(sources) + self.destinations.log_prob(actions % SQUARES)
+
+    def entropy(self) -> T.Tensor:
+        # H(source) + E[H(destination | source)]. The table has the destinations of every source, so the expectation
+        # is exact. The remembered masks only have those of the taken source, which makes the conditional entropy of
+        # the taken source a one sample estimate of it
+        if not self.packed:
+            if self.destinations is None:
+                raise RuntimeError("The entropy of remembered masks needs the actions, call log_prob first")
+            return self.sources.entropy() + self.destinations.entropy()
+
+        n = len(self.x)
+        masks = unpack_masks(self.masks[:, SQUARE_BYTES:], SQUARES * SQUARES).view(n * SQUARES, SQUARES)
+        every_source = T.eye(SQUARES, dtype=self.x.dtype, device=self.x.device).repeat(n, 1)
+        x = T.cat([self.x.repeat_interleave(SQUARES, dim=0), every_source], dim=1)
+        destinations = Actor.mask_logits(self.head.destination_head(x), masks)
+        # The illegal sources have no probability, so their destinations do not count
+        return self.sources.entropy() + (self.sources.probs * destinations.entropy().view(n, SQUARES)).sum(dim=1)
+
+
+class FactorizedHead(nn.Module):
+    def __init__(self, hidden_size: int) -> None:
+        super().__init__()
+        self.source_head = nn.Linear(hidden_size, SQUARES)
+        self.destination_head = nn.Linear(hidden_size + SQUARES, SQUARES)
+
+    def forward(self, x: T.Tensor, action_mask: T.Tensor) -> FactorizedCategorical:
+        return FactorizedCategorical(self, x, action_mask)
+
+
+class FactorizedActor(nn.Module):
+    def __init__(self, state_dim: int, hidden_layers: tuple[int]) -> None:
+        super().__init__()
+        self.state_dim = state_dim
+        self.hidden_layers = hidden_layers
+        self.trunk = build_trunk(state_dim, hidden_layers)
+        self.head = FactorizedHead(hidden_layers[-1])
+
+    def forward(self, states: T.Tensor, action_mask: T.Tensor) -> FactorizedCategorical:
+        return self.head(self.trunk(states), action_mask)
@@ -0,0 +1,57 @@
+import threading
+from queue import Queue
+
+import numpy as np
+import torch as T
+
+import utils
+
+
+class RolloutTensors:
+    def __init__(self, sample: tuple, device: T.device, action_dim: int) -> None:
+        # Converted once per learn, the minibatches of every epoch are index selects on these tensors
+        states, actions, rewards, goals, probs, values, masks, advantages, _ = sample
+        self.action_dim = action_dim
+        self.states = T.as_tensor(states, dtype=T.float32, device=device)
+        self.actions = T.as_tensor(actions, dtype=T.int64, device=device)
+        self.probs = T.as_tensor(probs, dtype=T.float32, device=device)
+        self.values = T.as_tensor(values, dtype=T.float32, device=device)
+        self.masks = T.as_tensor(masks, device=device)
+        self.advantages = T.as_tensor(advantages, dtype=T.float32, device=device)
+
+    def get_batch(self, batch: np.ndarray) -> tuple[T.Tensor, ...]:
+        batch = T.as_tensor(batch, device=self.states.device)
+        return (
+            self.states.index_select(0, batch),
+            self.actions.index_select(0, batch),
+            self.probs.index_select(0, batch),
+            self.values.index_select(0, batch),
+            utils.unpack_masks(self.masks.index_select(0, batch), self.action_dim),
+            self.advantages.index_select(0, batch),
+        )
+
+    def get_batches(self, batches: list[np.ndarray]):
+        # The next minibatch is built on a background thread while the current one is trained on
+        return prefetch(self.get_batch(batch) for batch in batches)
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+
+def prefetch(items, size: int = 1):
+    queue = Queue(maxsize=size)
+    end = object()
+
+    def produce():
+        try:
+            for item in items:
+                queue.put(item)
+        except Exception as exception:
+            queue.put(exception)
+        queue.put(end)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while (item := queue.get()) is not end:
+        if isinstance(item, Exception):
+            raise item
+        yield item
@@ -9,6 +9,7 @@ from agents import PlayAgent
 from aow.game.aow import ArtOfWar
 from buffer.episode import Episode
 from learnings.ppo import PPO
+from utils import getenv_flag
 
 load_dotenv()
 
@@ -29,6 +30,9 @@ ppo = PPO(
     gae_lambda=float(os.getenv("PPO_GAE_LAMBDA")),
     policy_clip=float(os.getenv("PPO_POLICY_CLIP")),
     learning_rate=float(os.getenv("PPO_LEARNING_RATE")),
+    shared=getenv_flag("PPO_SHARED"),
+    masked_logits=getenv_flag("PPO_MASKED_LOGITS"),
+    factorized=getenv_flag("PPO_FACTORIZED"),
 )
 
 # Create an instance of PlayAgent
@@ -69,7 +73,7 @@ while running:
             t2 = ord(action_str[2]) - ord('a')
             to_pos = np.array([t1, t2])
 
-            src, dst, mask = env.aow_logic.get_all_actions(turn)
+            src, dst, mask = env.observe()[1]
             action = np.where((src == from_pos).all(axis=1) & (dst == to_pos).all(axis=1))[0]
 
             # getting all valid actions for the piece
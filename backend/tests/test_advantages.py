@@ -0,0 +1,92 @@
+import numpy as np
+
+from buffer.episode import Episode, compute_advantages
+from buffer.ppo import BufferPPO
+
+GAMMA = 0.99
+GAE_LAMBDA = 0.95
+
+
+def reference_advantages(episode: Episode, gamma: float, gae_lambda: float) -> np.ndarray:
+    # One step at a time, the way GAE is written down
+    n = len(episode)
+    rewards = [float(reward) for reward in episode.rewards]
+    values = [float(value) for value in episode.values]
+    advantages = np.zeros(n)
+    for t in range(n - 2, -1, -1):
+        not_goal = 0.0 if episode.goals[t] else 1.0
+        delta = rewards[t] + gamma * values[t + 1] * not_goal - values[t]
+        advantages[t] = delta + gamma * gae_lambda * advantages[t + 1]
+    return advantages
+
+
+def make_episode(rng: np.random.Generator, n: int) -> Episode:
+    episode = Episode()
+    for t in range(n):
+        goal = t == n - 1 and rng.random() < 0.5
+        episode.add(
+            state=rng.integers(0, 8, 128, dtype=np.uint8),
+            reward=float(rng.integers(-20, 20)),
+            action=int(rng.integers(0, 1200)),
+            goal=goal,
+            prob=float(rng.normal()),
+            value=float(np.float32(rng.normal() * 10)),
+            masks=rng.random(1200) < 0.1,
+        )
+    return episode
+
+
+def test_episode_matches_reference():
+    rng = np.random.default_rng(0)
+    for n in (1, 2, 3, 17, 64):
+        episode = make_episode(rng, n)
+        expected = reference_advantages(episode, GAMMA, GAE_LAMBDA)
+        assert np.array_equal(episode.calc_advantage(GAMMA, GAE_LAMBDA), expected)
+
+
+def test_batch_matches_reference():
+    rng = np.random.default_rng(1)
+    episodes = [make_episode(rng, n) for n in (5, 1, 64, 2, 33)]
+    advantages = compute_advantages(
+        np.concatenate([episode.rewards for episode in episodes]),
+        np.concatenate([episode.values for episode in episodes]),
+        np.concatenate([episode.goals for episode in episodes]),
+        [len(episode) for episode in episodes],
+        GAMMA,
+        GAE_LAMBDA,
+    )
+    expected = np.concatenate([reference_advantages(episode, GAMMA, GAE_LAMBDA) for episode in episodes])
+    assert np.array_equal(advantages, expected)
+
+
+def test_buffer_matches_reference():
+    rng = np.random.default_rng(2)
+    episodes = [make_episode(rng, n) for n in (7, 64, 1, 20)]
+    buffer = BufferPPO(
+        max_size=8, batch_size=16, gamma=GAMMA, gae_lambda=GAE_LAMBDA, max_steps=64, state_dim=128, action_dim=1200,
+    )
+    for episode in episodes:
+        buffer.add(episode)
+
+    advantages = buffer.sample()[7]
+    expected = np.concatenate([reference_advantages(episode, GAMMA, GAE_LAMBDA) for episode in episodes])
+    assert np.array_equal(advantages, expected.astype(np.float32))
+
+
+def test_buffer_evicts_oldest():
+    rng = np.random.default_rng(3)
+    episodes = [make_episode(rng, n) for n in rng.integers(1, 9, 30)]
+    buffer = BufferPPO(
+        max_size=4, batch_size=16, gamma=GAMMA, gae_lambda=GAE_LAMBDA, max_steps=8, state_dim=128, action_dim=1200,
+    )
+    for added, episode in enumerate(episodes, 1):
+        buffer.add(episode)
+
+        # Like a deque with a maxlen, exactly the newest max_size episodes are kept, also after the columns are compacted
+        kept = episodes[max(added - 4, 0):added]
+        assert buffer.get_len() == len(kept)
+        sample = buffer.sample()
+        assert np.array_equal(sample[0], np.concatenate([episode.states for episode in kept]))
+        assert np.array_equal(sample[1], np.concatenate([episode.actions for episode in kept]))
+        expected = np.concatenate([reference_advantages(episode, GAMMA, GAE_LAMBDA) for episode in kept])
+        assert np.array_equal(sample[7], expected.astype(np.float32))
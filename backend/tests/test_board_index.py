@@ -0,0 +1,111 @@
+import numpy as np
+
+import aow.pieces as Pieces
+from aow.game.aow import ArtOfWar
+from aow.models import Cell
+from aow.models.board import AoWBoard
+
+
+def check_index(board: AoWBoard) -> None:
+    # Every named piece is indexed on its cell, and every index entry points to a piece on that cell
+    for turn in range(2):
+        for slot, name in enumerate(board.slot_names[turn]):
+            pos = board.pieces[turn][name]
+            if pos is None:
+                assert (board.slots[turn][slot, 1:] == -1).all(), name
+                continue
+            assert tuple(board.slots[turn][slot, 1:]) == tuple(pos), name
+            assert board.squares[turn, pos[0], pos[1]] == slot, name
+            assert board.board[turn, pos[0], pos[1]] == board.slots[turn][slot, 0], name
+        for row, col in zip(*np.nonzero(board.squares[turn] >= 0)):
+            assert board.board[turn, row, col] != Pieces.EMPTY
+
+
+def snapshot(board: AoWBoard) -> tuple:
+    return (
+        board.board.copy(), board.moved.copy(), board.squares.copy(), [slots.copy() for slots in board.slots],
+        [dict(pieces) for pieces in board.pieces], board.hash, board.version,
+    )
+
+
+def assert_same(before: tuple, after: tuple) -> None:
+    for expected, actual in zip(before, after):
+        if isinstance(expected, list) and expected and isinstance(expected[0], np.ndarray):
+            for e, a in zip(expected, actual):
+                np.testing.assert_array_equal(e, a)
+        elif isinstance(expected, np.ndarray):
+            np.testing.assert_array_equal(expected, actual)
+        else:
+            assert expected == actual
+
+
+def make_board(cells: dict) -> AoWBoard:
+    numbers = np.zeros((2, 8, 8), dtype=np.uint8)
+    for (turn, row, col), piece_number in cells.items():
+        numbers[turn, row, col] = piece_number
+    board = AoWBoard()
+    board.set_board(numbers)
+    return board
+
+
+def test_king_move_away_from_the_corner_does_not_castle():
+    # A king on (1, 0) probed two columns to the right, with a bishop on the corner of its row
+    board = make_board({
+        (0, 1, 0): Pieces.KING, (0, 1, 7): Pieces.BISHOP, (0, 1, 5): Pieces.PAWN, (1, 0, 4): Pieces.KING,
+    })
+    before = snapshot(board)
+
+    record = board.make_move(0, Cell(1, 0), Cell(1, 2))
+    assert board.board[0, 1, 7] == Pieces.BISHOP
+    assert board.board[0, 1, 5] == Pieces.PAWN
+    check_index(board)
+
+    board.unmake_move(record)
+    check_index(board)
+    assert_same(before, snapshot(board))
+
+
+def test_castle_moves_the_rook():
+    board = make_board({(0, 0, 4): Pieces.KING, (0, 0, 7): Pieces.ROOK, (1, 0, 4): Pieces.KING})
+    before = snapshot(board)
+    rook = board.get_piece_name(0, Cell(0, 7))
+
+    record = board.make_move(0, Cell(0, 4), Cell(0, 6))
+    assert board.board[0, 0, 5] == Pieces.ROOK and board.board[0, 0, 7] == Pieces.EMPTY
+    assert board.get_piece_name(0, Cell(0, 5)) == rook
+    check_index(board)
+
+    board.unmake_move(record)
+    assert_same(before, snapshot(board))
+
+
+def test_random_make_unmake_keeps_the_index():
+    rng = np.random.default_rng(0)
+    for _ in range(3):
+        env = ArtOfWar(max_steps=40, render_mode="rgb_array")
+        env.reset()
+        board = env.aow_board
+        done = False
+        while not done:
+            turn = env.aow_logic.turn
+            # Looking for the legal actions makes and unmakes every move of the player
+            source_pos, possibles, mask = env.aow_logic.get_all_actions(turn)
+            check_index(board)
+
+            legal = np.flatnonzero(mask[:len(source_pos)])
+            # The card actions follow the actions of the pieces, they and the upgrades are not made with make_move
+            pieces_actions = env.aow_logic.get_pieces_actions(turn)[2]
+            pieces_length = sum(len(actions_mask) for actions_mask in pieces_actions)
+            # Both engines allow the same moves
+            bitboard_actions = env.aow_logic.bitboard_engine.get_pieces_actions(turn)[2]
+            np.testing.assert_array_equal(np.concatenate(pieces_actions), np.concatenate(bitboard_actions))
+            moves = [action for action in legal[legal < pieces_length] if (source_pos[action] != possibles[action]).any()]
+            before = snapshot(board)
+            for action in rng.choice(moves, size=min(8, len(moves)), replace=False):
+                record = board.make_move(turn, Cell(*source_pos[action]), Cell(*possibles[action]))
+                check_index(board)
+                board.unmake_move(record)
+                assert_same(before, snapshot(board))
+
+            _, done, _ = env.step(int(rng.choice(legal)))
+            check_index(board)
@@ -0,0 +1,77 @@
+import numpy as np
+
+import aow.pieces as Pieces
+from agents.base import BaseAgent
+from aow.game.aow import ArtOfWar
+from buffer.dqn import BufferDQN
+from buffer.episode import Episode
+
+GAMMA = 0.9
+
+
+def play_scripted_game(max_steps: int = 16, seed: int = 26) -> tuple[Episode, list[tuple]]:
+    # Seeded random legal actions, remembered the way BaseAgent.play_episode does it. In this game black's replies
+    # give white rewards too
+    rng = np.random.default_rng(seed)
+    env = ArtOfWar(max_steps=max_steps, render_mode="rgb_array")
+    env.reset()
+    episodes = {Pieces.WHITE: Episode(), Pieces.BLACK: Episode()}
+    previous = {Pieces.WHITE: None, Pieces.BLACK: None}
+    # The decisions of white: state, action, own reward and the rewards of black's replies
+    decisions = []
+    done = False
+    while not done:
+        turn = env.aow_logic.turn
+        state, (_, _, mask) = env.observe()
+        action = int(rng.choice(np.flatnonzero(mask)))
+        rewards, done, _ = env.step(action)
+
+        episodes[turn].add(state, rewards[turn], action, False, 0.0, 0.0, mask)
+        BaseAgent.update_enemy(previous[1 - turn], episodes[1 - turn], rewards[1 - turn])
+        previous[turn] = [state, rewards[turn], action, False, 0.0, 0.0, mask]
+
+        if turn == Pieces.WHITE:
+            decisions.append((state.copy(), action, rewards[turn], 0.0))
+        elif decisions:
+            state, action, reward, replies = decisions[-1]
+            decisions[-1] = (state, action, reward, replies + rewards[Pieces.WHITE])
+    return episodes[Pieces.WHITE], decisions
+
+
+def make_buffer(n_steps: int) -> BufferDQN:
+    return BufferDQN(
+        max_size=4, batch_size=4, gamma=GAMMA, n_steps=n_steps, max_steps=16, state_dim=128, action_dim=1200,
+    )
+
+
+def test_transitions_follow_the_decisions():
+    episode, decisions = play_scripted_game()
+    # The decisions are repeated with the rewards of the replies
+    assert len(episode) > len(decisions)
+    assert any(decision[3] != 0 for decision in decisions)
+
+    buffer = make_buffer(n_steps=1)
+    assert buffer.add(episode) == len(decisions)
+    n = len(decisions)
+    states = np.array([decision[0] for decision in decisions])
+    rewards = np.array([decision[2] + decision[3] for decision in decisions])
+
+    assert np.array_equal(buffer.states[:n], states)
+    assert np.array_equal(buffer.actions[:n], [decision[1] for decision in decisions])
+    assert np.array_equal(buffer.returns[:n], rewards.astype(np.float32))
+    assert np.array_equal(buffer.next_states[:n - 1], states[1:])
+    assert not (buffer.next_states[:n - 1] == buffer.states[:n - 1]).all(axis=1).any()
+    assert np.array_equal(buffer.dones[:n], np.arange(n) == n - 1)
+
+
+def test_n_step_returns_count_every_reward_once():
+    episode, decisions = play_scripted_game()
+    buffer = make_buffer(n_steps=3)
+    buffer.add(episode)
+    n = len(decisions)
+    rewards = np.array([decision[2] + decision[3] for decision in decisions])
+
+    expected = [sum(GAMMA ** i * rewards[t + i] for i in range(min(3, n - t))) for t in range(n)]
+    assert np.allclose(buffer.returns[:n], expected)
+    assert np.array_equal(buffer.next_states[:n], np.array([decision[0] for decision in decisions])[
+        np.minimum(np.arange(n) + 3, n - 1)])
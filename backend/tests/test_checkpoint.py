@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from utils.checkpoint import PENDING, wait_for_checkpoints, write_checkpoint
+
+
+@pytest.fixture(autouse=True)
+def clear_pending():
+    yield
+    PENDING.clear()
+
+
+def fail(checkpoint, file):
+    raise OSError("disk full")
+
+
+def test_failed_write_is_raised(tmp_path):
+    write_checkpoint({"episode": 1}, str(tmp_path / "failed.pt"), save=fail)
+    write_checkpoint({"episode": 1}, str(tmp_path / "written.pt"))
+    with pytest.raises(OSError):
+        wait_for_checkpoints()
+    # The other write still finished, and nothing was left behind by the failed one
+    assert os.listdir(tmp_path) == ["written.pt"]
+
+
+def test_failed_write_is_raised_by_the_next_write(tmp_path):
+    write_checkpoint({"episode": 1}, str(tmp_path / "failed.pt"), save=fail).exception()
+    with pytest.raises(OSError):
+        write_checkpoint({"episode": 2}, str(tmp_path / "next.pt"))
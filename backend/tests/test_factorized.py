@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+import torch as T
+
+from aow.game.action_codec import SQUARES, TABLE_LENGTH, ActionCodec
+from aow.game.aow import ArtOfWar
+from learnings.factorized_actor import FactorizedActor
+
+
+def observe_table(steps: int = 3) -> tuple[np.ndarray, tuple]:
+    rng = np.random.default_rng(0)
+    env = ArtOfWar(max_steps=16, render_mode="rgb_array")
+    env.reset()
+    for _ in range(steps):
+        _, (_, _, mask) = env.observe()
+        env.step(int(rng.choice(np.flatnonzero(mask))))
+    state, actions = env.observe()
+    return state, actions
+
+
+def test_table_is_packed():
+    _, (source_pos, possibles, mask) = observe_table()
+    table = ActionCodec.get_table(source_pos, possibles, mask)
+    assert table.dtype == np.uint8 and table.shape == (TABLE_LENGTH // 8,)
+
+    unpacked = np.unpackbits(table).astype(bool)
+    pairs = ActionCodec.get_pairs(source_pos, possibles)[mask[:len(source_pos)].astype(bool)]
+    assert set(np.flatnonzero(unpacked[SQUARES:])) == set(pairs)
+    for pair in pairs[:5]:
+        start = SQUARES + pair // SQUARES * SQUARES
+        expected = np.concatenate((unpacked[:SQUARES], unpacked[start:start + SQUARES]))
+        assert (ActionCodec.get_mask(table, int(pair)) == expected).all()
+
+
+def make_dist(actor: FactorizedActor, state: np.ndarray, actions: tuple, n: int = 1):
+    table = ActionCodec.get_table(*actions)
+    states = T.tensor(np.repeat(state[None], n, axis=0), dtype=T.float32)
+    return actor(states, T.tensor(np.repeat(table[None], n, axis=0))), table
+
+
+def test_table_entropy_is_exact():
+    T.manual_seed(0)
+    state, actions = observe_table()
+    actor = FactorizedActor(len(state), (32,))
+    # Every legal pair, with the probabilities of the joint distribution
+    legal = np.unique(ActionCodec.get_pairs(actions[0], actions[1])[actions[2][:len(actions[0])].astype(bool)])
+    dist, _ = make_dist(actor, state, actions, len(legal))
+    log_probs = dist.log_prob(T.as_tensor(legal)).double()
+    assert log_probs.exp().sum().item() == pytest.approx(1, abs=1e-5)
+    expected = -(log_probs.exp() * log_probs).sum()
+    assert dist.entropy()[0].item() == pytest.approx(expected.item(), abs=1e-4)
+
+
+def test_remembered_entropy_uses_the_taken_source():
+    T.manual_seed(0)
+    state, actions = observe_table()
+    actor = FactorizedActor(len(state), (32,))
+    table_dist, table = make_dist(actor, state, actions)
+    pair = int(table_dist.sample())
+
+    mask = ActionCodec.get_mask(table, pair)
+    dist = actor(T.tensor(state[None], dtype=T.float32), T.tensor(mask[None], dtype=T.float32))
+    with pytest.raises(RuntimeError):
+        dist.entropy()
+
+    T.testing.assert_close(dist.log_prob(T.tensor([pair])), table_dist.log_prob(T.tensor([pair])))
+    expected = table_dist.sources.entropy() + table_dist.get_destinations(T.tensor([pair // SQUARES])).entropy()
+    T.testing.assert_close(dist.entropy(), expected)
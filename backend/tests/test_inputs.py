@@ -0,0 +1,51 @@
+import copy
+import pickle
+import threading
+
+import numpy as np
+
+from aow.game.aow import ArtOfWar
+from learnings.ppo import PPO
+
+
+def make_learner() -> PPO:
+    env = ArtOfWar(max_steps=6, render_mode="rgb_array")
+    env.reset()
+    return PPO(
+        env, hidden_layers=(16,), epochs=1, buffer_size=8, batch_size=8, gamma=0.99, gae_lambda=0.95,
+        policy_clip=0.2, learning_rate=1e-3,
+    )
+
+
+def test_threads_get_their_own_inputs():
+    learner = make_learner()
+    barrier = threading.Barrier(2)
+    kept = {}
+
+    def get(value: float):
+        states = np.full((3, learner.state_dim), value, dtype=np.float32)
+        masks = np.full((3, 5), value, dtype=np.float32)
+        state_inputs, mask_inputs = learner.get_inputs(states, masks)
+        # Both threads have written their inputs before either reads them back
+        barrier.wait()
+        kept[value] = (state_inputs.cpu().numpy().copy(), mask_inputs.cpu().numpy().copy())
+
+    threads = [threading.Thread(target=get, args=(value,)) for value in (1.0, 2.0)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for value, (state_inputs, mask_inputs) in kept.items():
+        assert (state_inputs == value).all()
+        assert (mask_inputs == value).all()
+
+
+def test_learner_copies_without_inputs():
+    learner = make_learner()
+    state, (_, _, mask) = ArtOfWar(max_steps=6, render_mode="rgb_array").observe()
+    learner.take_action(state, mask)
+
+    for clone in (copy.deepcopy(learner), pickle.loads(pickle.dumps(learner))):
+        assert clone.inputs is not learner.inputs
+        assert clone.take_action(state, mask)[0] in np.flatnonzero(mask)
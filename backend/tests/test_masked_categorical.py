@@ -0,0 +1,42 @@
+import torch as T
+from torch.distributions.categorical import Categorical
+
+from learnings.actor import MASKED_LOGIT, Actor, MaskedCategorical
+
+
+def make_inputs(seed: int = 0) -> tuple[T.Tensor, T.Tensor]:
+    generator = T.Generator().manual_seed(seed)
+    x = T.randn(6, 40, generator=generator)
+    mask = (T.rand(6, 40, generator=generator) < 0.2).float()
+    mask[:, 0] = 1
+    return x, mask
+
+
+def test_matches_categorical():
+    x, mask = make_inputs()
+    x.requires_grad_()
+    dist = Actor.mask_logits(x, mask)
+    reference = Categorical(logits=x.masked_fill(mask == 0, MASKED_LOGIT))
+
+    # Sampling only needs the probabilities, the normalized logits wait for log_prob
+    actions = dist.sample((20,))
+    assert "logits" not in dist.__dict__
+    assert mask.gather(1, actions.T).all()
+    T.testing.assert_close(dist.log_prob(actions), reference.log_prob(actions))
+    T.testing.assert_close(dist.entropy(), reference.entropy())
+    T.testing.assert_close(dist.probs, reference.probs)
+
+    grad, = T.autograd.grad(dist.log_prob(actions[0]).sum() + dist.entropy().sum(), x)
+    reference_grad, = T.autograd.grad(reference.log_prob(actions[0]).sum() + reference.entropy().sum(), x)
+    T.testing.assert_close(grad, reference_grad)
+
+
+def test_expand():
+    x, mask = make_inputs()
+    dist = Actor.mask_logits(x, mask)
+    expanded = dist.expand((3, 6))
+
+    assert isinstance(expanded, MaskedCategorical)
+    assert expanded.batch_shape == (3, 6)
+    T.testing.assert_close(expanded.logits[1], dist.logits)
+    T.testing.assert_close(expanded.probs[2], dist.probs)
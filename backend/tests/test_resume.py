@@ -0,0 +1,43 @@
+import warnings
+
+from agents import DoubleAgents
+from aow.game.aow import ArtOfWar
+from learnings.ppo import PPO
+from utils.checkpoint import wait_for_checkpoints
+
+warnings.filterwarnings("ignore")
+
+
+def make_agent(result_folder: str, episodes: int) -> DoubleAgents:
+    env = ArtOfWar(max_steps=6, render_mode="rgb_array")
+    env.reset()
+    ppo = PPO(
+        env, hidden_layers=(16,), epochs=1, buffer_size=8, batch_size=8, gamma=0.99, gae_lambda=0.95,
+        policy_clip=0.2, learning_rate=1e-3,
+    )
+    return DoubleAgents(env, ppo, episodes=episodes, train_on=2, result_folder=result_folder)
+
+
+def train(agent: DoubleAgents) -> None:
+    # Like train.py, a save after the last episode
+    agent.train(render_each=10 ** 9, save_on_learn=True)
+    agent.save()
+    wait_for_checkpoints()
+
+
+def test_resume_between_learns_keeps_learning(tmp_path):
+    fresh = make_agent(str(tmp_path / "fresh"), episodes=9)
+    train(fresh)
+    assert fresh.white_agent.learn_steps == 4
+
+    # Stopped after 3 episodes, between two learns, then resumed to 9 episodes
+    train(make_agent(str(tmp_path / "resumed"), episodes=3))
+    resumed = make_agent(str(tmp_path / "resumed"), episodes=9)
+    assert resumed.load()
+    assert resumed.current_ep == 3
+    assert resumed.white_agent.learn_steps == 1
+
+    train(resumed)
+    assert resumed.current_ep == 9
+    assert resumed.white_agent.learn_steps == fresh.white_agent.learn_steps
+    assert (resumed.moves > 0).all()
@@ -0,0 +1,151 @@
+import multiprocessing as mp
+import threading
+import warnings
+
+import numpy as np
+import torch as T
+import torch.multiprocessing as torch_mp
+
+import agents.base
+from agents import DoubleAgents
+from agents.rollout import AsyncRolloutPool, RolloutPool, SharedWeights
+from aow.game.aow import ArtOfWar
+from learnings.dqn import DQNLearner
+
+warnings.filterwarnings("ignore")
+
+
+def make_agent(result_folder: str, episodes: int) -> DoubleAgents:
+    env = ArtOfWar(max_steps=6, render_mode="rgb_array")
+    env.reset()
+    dqn = DQNLearner(
+        env, epochs=1, gamma=0.99, learning_rate=1e-3, hidden_layers=(16,), buffer_size=8, batch_size=8,
+        epsilon=0.5, epsilon_decay=0.9, epsilon_min=0.05, tau=0.01, update_every=1,
+    )
+    return DoubleAgents(env, dqn, episodes=episodes, train_on=2, result_folder=result_folder)
+
+
+def set_policy(agent: DoubleAgents, value: float, epsilon: float) -> None:
+    # Every action gets the same Q value, so the played values and probabilities show the weights and the epsilon
+    for learner in agent.get_learners():
+        with T.no_grad():
+            for parameter in learner.parameters():
+                parameter.zero_()
+            for model in (learner.dqn, learner.target_dqn):
+                list(model.parameters())[-1].fill_(value)
+        learner.set_counters({"learn_steps": 3, "epsilon": epsilon})
+
+
+def test_pool_plays_with_the_agents_weights_and_counters(tmp_path):
+    agent = make_agent(str(tmp_path), episodes=7)
+    pool = RolloutPool(agent, workers=2)
+    try:
+        # Changed after the workers started, so the workers only know them from play
+        set_policy(agent, value=7.0, epsilon=0.0)
+        results = pool.play(agent, [(episode, False) for episode in range(5)])
+        assert [result.episode for result in results] == list(range(5))
+        for result in results:
+            assert len(result.white) > 0 and len(result.black) > 0
+            assert 0 < result.stats[0].sum() <= 6
+            for episode in (result.white, result.black):
+                assert np.allclose(episode.values, 7.0)
+                # Greedy, the chosen action is always the greedy one
+                assert np.allclose(episode.probs, 1.0)
+
+        set_policy(agent, value=-2.0, epsilon=1.0)
+        results = pool.play(agent, [(episode, False) for episode in range(5, 7)])
+        assert [result.episode for result in results] == [5, 6]
+        for result in results:
+            assert np.allclose(result.white.values, -2.0)
+            # Random, every legal action has the same probability
+            assert (np.array(result.white.probs) < 1).all()
+    finally:
+        pool.close()
+
+    assert all(not process.is_alive() for process in pool.processes)
+
+
+def test_shared_weights_publish_and_load(tmp_path):
+    source, target = make_agent(str(tmp_path), episodes=1), make_agent(str(tmp_path), episodes=1)
+    weights = SharedWeights(target.get_learners(), torch_mp.get_context("spawn"))
+    assert weights.get_version() == 0
+
+    set_policy(source, value=4.0, epsilon=0.25)
+    assert weights.publish(source.get_learners()) == 1
+    assert weights.load(target.get_learners()) == 1
+    for expected, learner in zip(source.get_learners(), target.get_learners()):
+        for key, value in expected.state_dict().items():
+            assert T.equal(learner.state_dict()[key], value)
+        assert learner.get_counters() == {"learn_steps": 3, "epsilon": 0.25}
+        assert type(learner.learn_steps) is int
+
+
+class FakeAsyncPool:
+    # Hands out episodes played in this process, all with the weights of version 0
+    pools: list["FakeAsyncPool"] = []
+
+    def __init__(self, agent, workers: int, render_each: int):
+        start = agent.current_ep
+        self.results = [agent.play_episode(episode, False) for episode in range(start, agent.episodes)]
+        agent.current_ep = start
+        self.version = 0
+        self.closed = False
+        self.pools.append(self)
+
+    def get(self):
+        return self.results.pop(0)
+
+    def get_version(self) -> int:
+        return self.version
+
+    def publish(self, agent) -> int:
+        self.version += 1
+        return self.version
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_train_async_skips_stale_episodes(tmp_path, monkeypatch):
+    monkeypatch.setattr(agents.base, "AsyncRolloutPool", FakeAsyncPool)
+    agent = make_agent(str(tmp_path), episodes=6)
+    agent.asynchronous = True
+    agent.max_staleness = 1
+    agent.train(render_each=10 ** 9, save_on_learn=False)
+
+    # Episodes 0 to 3 are at most one version old and learned from, 4 and 5 are two versions old
+    pool, = FakeAsyncPool.pools
+    assert pool.version == 2 and pool.closed
+    assert agent.white_agent.learn_steps == 2
+    assert agent.collected == 0
+    # All episodes are still in the stats
+    assert agent.current_ep == 6
+    assert (agent.moves.sum(axis=0) > 0).all()
+
+
+def test_train_async(tmp_path):
+    agent = make_agent(str(tmp_path), episodes=6)
+    agent.workers = 2
+    agent.asynchronous = True
+    agent.max_staleness = 10
+    agent.train(render_each=10 ** 9, save_on_learn=False)
+
+    assert agent.current_ep == 6
+    assert agent.white_agent.learn_steps == 3
+    assert (agent.moves.sum(axis=0) > 0).all()
+    assert not mp.active_children()
+
+
+def test_async_pool_closes_with_a_full_queue(tmp_path):
+    agent = make_agent(str(tmp_path), episodes=40)
+    pool = AsyncRolloutPool(agent, workers=2, render_each=10 ** 9)
+    result = pool.get()
+    assert 0 <= result.episode < 40
+    assert result.white.policy_version == result.black.policy_version == 0
+
+    # The learner stops early, the workers are blocked on the bounded queue
+    closing = threading.Thread(target=pool.close)
+    closing.start()
+    closing.join(timeout=120)
+    assert not closing.is_alive()
+    assert all(not process.is_alive() for process in pool.processes)
@@ -0,0 +1,73 @@
+import warnings
+
+import numpy as np
+
+from agents import DoubleAgents
+from aow.game.aow import ArtOfWar
+from aow.game.vec_aow import VecArtOfWar
+from aow.models.board import AoWBoard
+from learnings.ppo import PPO
+
+warnings.filterwarnings("ignore")
+
+
+def assert_same_as_games(vec_env: VecArtOfWar, states: np.ndarray, masks: np.ndarray) -> None:
+    for index in range(len(vec_env)):
+        state, (_, _, mask) = vec_env.get_env(index).observe()
+        assert np.array_equal(states[index], state)
+        assert np.array_equal(masks[index], mask)
+
+
+def test_vec_env_matches_its_games():
+    vec_env = VecArtOfWar(3, max_steps=40)
+    states, masks = vec_env.reset()
+    assert states.shape[0] == masks.shape[0] == 3
+    assert_same_as_games(vec_env, states, masks)
+
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        actions = np.array([rng.choice(np.flatnonzero(mask)) for mask in masks])
+        active = rng.random(3) < 0.7
+        steps = vec_env.steps.copy()
+        states, masks, rewards, dones, infos = vec_env.step(actions, active)
+        assert_same_as_games(vec_env, states, masks)
+        assert (vec_env.steps[~active] == steps[~active]).all()
+        assert (rewards[~active] == 0).all()
+
+
+def test_vec_env_resets_finished_games():
+    vec_env = VecArtOfWar(2, max_steps=3)
+    _, masks = vec_env.reset()
+    # The same game played alone, to know the last position of the finished one
+    game = ArtOfWar(max_steps=3, render_mode="rgb_array")
+    game.reset()
+    for step in range(3):
+        actions = np.array([np.flatnonzero(mask)[0] for mask in masks])
+        game.step(int(actions[0]))
+        _, masks, _, dones, _ = vec_env.step(actions)
+        assert dones.all() == (step == 2)
+
+    assert (vec_env.steps == 0).all()
+    assert np.array_equal(vec_env.boards[0], AoWBoard.init_board())
+    assert np.array_equal(vec_env.final_boards[0], game.aow_board.get_board())
+
+
+def test_training_plays_on_the_vec_env(tmp_path):
+    env = ArtOfWar(max_steps=6, render_mode="rgb_array")
+    env.reset()
+    ppo = PPO(
+        env, hidden_layers=(16,), epochs=1, buffer_size=8, batch_size=8, gamma=0.99, gae_lambda=0.95,
+        policy_clip=0.2, learning_rate=1e-3,
+    )
+    agent = DoubleAgents(env, ppo, episodes=6, train_on=3, result_folder=str(tmp_path), num_envs=2)
+
+    results = agent.play_episodes([(episode, False) for episode in range(3)])
+    assert [result.episode for result in results] == [0, 1, 2]
+    for result in results:
+        assert len(result.white) > 0 and len(result.black) > 0
+        assert 0 < result.stats[0].sum() <= 6
+
+    agent.train(render_each=10 ** 9, save_on_learn=False)
+    assert agent.current_ep == 6
+    assert agent.white_agent.learn_steps == 2
+    assert (agent.moves.sum(axis=0) > 0).all()
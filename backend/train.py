@@ -8,6 +8,8 @@ from aow.game.aow import ArtOfWar
 from learnings.a2c import A2C
 from learnings.dqn import DQNLearner
 from learnings.ppo import PPO
+from utils import getenv_flag
+from utils.checkpoint import wait_for_checkpoints
 
 load_dotenv()
 
@@ -16,6 +18,7 @@ if __name__ == "__main__":
         window_size=int(os.getenv("AOW_WINDOW_SIZE")),
         max_steps=int(os.getenv("AOW_MAX_STEPS")),
         render_mode=os.getenv("AOW_RENDER_MODE"),
+        engine=os.getenv("AOW_ENGINE", "object"),
     )
     aow.reset()
 
@@ -37,6 +40,9 @@ if __name__ == "__main__":
             gae_lambda=float(os.getenv("PPO_GAE_LAMBDA")),
             policy_clip=float(os.getenv("PPO_POLICY_CLIP")),
             learning_rate=float(os.getenv("PPO_LEARNING_RATE")),
+            shared=getenv_flag("PPO_SHARED"),
+            masked_logits=getenv_flag("PPO_MASKED_LOGITS"),
+            factorized=getenv_flag("PPO_FACTORIZED"),
         )
 
         print(ppo.device)
@@ -48,6 +54,10 @@ if __name__ == "__main__":
             episodes=int(os.getenv("EPISODES")),
             train_on=int(os.getenv("BUFFER_SIZE")),
             result_folder=os.getenv("PPO_RESULT_FOLDER"),
+            workers=int(os.getenv("ROLLOUT_WORKERS", 1)),
+            asynchronous=getenv_flag("ROLLOUT_ASYNC"),
+            max_staleness=int(os.getenv("ROLLOUT_MAX_STALENESS", 1)),
+            num_envs=int(os.getenv("ROLLOUT_ENVS", 1)),
         )
     elif sys_args[1] == "dqn":
         dqn = DQNLearner(
@@ -63,6 +73,10 @@ if __name__ == "__main__":
             epsilon_min=float(os.getenv("DQN_EPSILON_MIN")),
             tau=float(os.getenv("DQN_TAU")),
             update_every=int(os.getenv("DQN_UPDATE_EVERY")),
+            n_steps=int(os.getenv("DQN_N_STEPS", 1)),
+            prioritized=getenv_flag("DQN_PRIORITIZED"),
+            alpha=float(os.getenv("DQN_PER_ALPHA", 0.6)),
+            beta=float(os.getenv("DQN_PER_BETA", 0.4)),
         )
         print(dqn.device)
         print(dqn)
@@ -73,6 +87,10 @@ if __name__ == "__main__":
             episodes=int(os.getenv("EPISODES")),
             train_on=int(os.getenv("BUFFER_SIZE")),
             result_folder=os.getenv("DQN_RESULT_FOLDER"),
+            workers=int(os.getenv("ROLLOUT_WORKERS", 1)),
+            asynchronous=getenv_flag("ROLLOUT_ASYNC"),
+            max_staleness=int(os.getenv("ROLLOUT_MAX_STALENESS", 1)),
+            num_envs=int(os.getenv("ROLLOUT_ENVS", 1)),
         )
 
     elif sys_args[1] == "a2c":
@@ -84,7 +102,10 @@ if __name__ == "__main__":
             batch_size=int(os.getenv("BATCH_SIZE")),
             gamma=float(os.getenv("A2C_GAMMA")),
             gae_lambda=float(os.getenv("A2C_GAE_LAMBDA")),
-            learning_rate=float(os.getenv("A2C_LEARNING_RATE"))
+            learning_rate=float(os.getenv("A2C_LEARNING_RATE")),
+            shared=getenv_flag("A2C_SHARED"),
+            masked_logits=getenv_flag("A2C_MASKED_LOGITS"),
+            factorized=getenv_flag("A2C_FACTORIZED"),
         )
 
         print(a2c.device)
@@ -96,8 +117,17 @@ if __name__ == "__main__":
             episodes=int(os.getenv("EPISODES")),
             train_on=int(os.getenv("BUFFER_SIZE")),
             result_folder=os.getenv("A2C_RESULT_FOLDER"),
+            workers=int(os.getenv("ROLLOUT_WORKERS", 1)),
+            asynchronous=getenv_flag("ROLLOUT_ASYNC"),
+            max_staleness=int(os.getenv("ROLLOUT_MAX_STALENESS", 1)),
+            num_envs=int(os.getenv("ROLLOUT_ENVS", 1)),
         )
 
-    agent.train(render_each=int(os.getenv("RENDER_EACH")), save_on_learn=bool(os.getenv("SAVE_ON_LEARN")))
+    # Continue from the last checkpoint in the result folder
+    if "--resume" in sys_args and agent.load():
+        print(f"Resuming from episode {agent.current_ep}")
+
+    agent.train(render_each=int(os.getenv("RENDER_EACH")), save_on_learn=getenv_flag("SAVE_ON_LEARN"))
     agent.save()
+    wait_for_checkpoints()
     aow.close()
@@ -1,3 +1,4 @@
+import os
 import re
 
 import cv2
@@ -6,28 +7,25 @@ import torch as T
 import torch.nn as nn
 
 
+def build_trunk(input_size: int, hidden_layers: tuple[int]) -> nn.Module:
+    layers = []
+    for in_features, out_features in zip((input_size,) + tuple(hidden_layers[:-1]), hidden_layers):
+        layers += [nn.Linear(in_features, out_features), nn.ReLU()]
+    return nn.Sequential(*layers)
+
+
 def build_base_model(
         input_size: int,
         hidden_layers: tuple[int],
         output_size: int,
         last_activation: nn.Module = nn.Identity(),
 ) -> nn.Module:
-    layers = [
-        nn.Linear(input_size, hidden_layers[0]),
-        nn.ReLU(),
-    ]
-
-    for i in range(len(hidden_layers) - 1):
-        in_features = hidden_layers[i]
-        out_features = hidden_layers[i + 1]
-        layers += [
-            nn.Linear(in_features, out_features),
-            nn.ReLU(),
-        ]
-
-    layers += [nn.Linear(hidden_layers[-1], output_size), last_activation]
-
-    return nn.Sequential(*layers)
+    # Kept one flat Sequential, the keys of the state_dict are those of the saved checkpoints
+    return nn.Sequential(
+        *build_trunk(input_size, hidden_layers),
+        nn.Linear(hidden_layers[-1], output_size),
+        last_activation,
+    )
 
 
 def make_batch_ids(n: int, batch_size: int, shuffle: bool = True) -> np.ndarray:
@@ -38,10 +36,28 @@ def make_batch_ids(n: int, batch_size: int, shuffle: bool = True) -> np.ndarray:
     return [indices[i: i + batch_size] for i in starts]
 
 
+def getenv_flag(name: str) -> bool:
+    # Only explicit true values, a set "false" or "0" is off like an unset flag
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes")
+
+
 def tensor_to_numpy(x: T.Tensor) -> np.ndarray:
     return x.detach().cpu().numpy()
 
 
+# The shifts that take the bits of a packed byte out in the order of np.packbits, the first bit is the highest
+BIT_SHIFTS = T.arange(7, -1, -1, dtype=T.uint8)
+
+
+def pack_mask(mask: np.ndarray) -> np.ndarray:
+    return np.packbits(mask)
+
+
+def unpack_masks(packed: T.Tensor, length: int) -> T.Tensor:
+    bits = (packed.unsqueeze(-1) >> BIT_SHIFTS.to(packed.device)) & 1
+    return bits.flatten(1)[:, :length].float()
+
+
 def save_to_video(path: str, frames: np.ndarray, fps: int = 2):
     size = frames.shape[1:3]
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
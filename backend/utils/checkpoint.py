@@ -0,0 +1,65 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+import numpy as np
+import torch as T
+
+# One writer thread, so the checkpoints are written in the order they were made. It is joined at exit, so a
+# checkpoint that is still being written is not lost
+EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+PENDING: list[Future] = []
+
+
+def snapshot(value):
+    # A copy of the tensors and arrays, training changes the originals while the copy is written
+    if isinstance(value, T.Tensor):
+        return value.detach().cpu().clone()
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, dict):
+        return type(value)((key, snapshot(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return type(value)(snapshot(item) for item in value)
+    return value
+
+
+def save_checkpoint(checkpoint, path: str, save: Callable = T.save) -> None:
+    # Written next to the checkpoint and renamed over it, so the checkpoint on disk is always complete
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            save(checkpoint, file)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def save_array(array: np.ndarray, file) -> None:
+    np.save(file, array)
+
+
+def check_checkpoints() -> None:
+    # A failed write raises here, so training does not go on without a checkpoint on disk
+    pending = []
+    for future in PENDING:
+        if future.done():
+            future.result()
+        else:
+            pending.append(future)
+    PENDING[:] = pending
+
+
+def write_checkpoint(checkpoint, path: str, save: Callable = T.save) -> Future:
+    check_checkpoints()
+    future = EXECUTOR.submit(save_checkpoint, snapshot(checkpoint), path, save)
+    PENDING.append(future)
+    return future
+
+
+def wait_for_checkpoints() -> None:
+    # Every write is finished before the first failure is raised
+    wait(PENDING)
+    check_checkpoints()